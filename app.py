@@ -1,7 +1,9 @@
 import streamlit as st
 import asyncio
 from utils.interview_manager import InterviewManager
-import json
+from models.llm_handler import LLMHandler
+import orjson
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -11,6 +13,16 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def get_llm():
+    """One LLMHandler for the whole Streamlit server, reused across reruns"""
+    return LLMHandler()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def generate_questions(job_description, num_questions, _llm):
+    """Memoize question generation per (job description, question count) across reruns and sessions"""
+    return _llm.generate_interview_questions(job_description, num_questions)["questions"]
+
 # Initialize session state
 if 'interview_manager' not in st.session_state:
     st.session_state.interview_manager = InterviewManager()
@@ -40,7 +52,11 @@ with st.sidebar:
         if st.button("Start Interview", type="primary"):
             if job_description:
                 with st.spinner("Generating interview questions..."):
-                    questions = st.session_state.interview_manager.setup_interview(job_description)
+                    interview_manager = st.session_state.interview_manager
+                    interview_manager.interview_data["job_description"] = job_description
+                    interview_manager.interview_data["questions"] = generate_questions(
+                        job_description, num_questions, get_llm()
+                    )
                     st.session_state.interview_stage = 'interview'
                     st.rerun()
             else:
@@ -48,9 +64,10 @@ with st.sidebar:
     
     elif st.session_state.interview_stage == 'interview':
         st.subheader("Interview Progress")
-        progress = st.session_state.current_question / len(st.session_state.interview_manager.interview_data["questions"])
-        st.progress(progress)
-        st.write(f"Question {st.session_state.current_question + 1} of {len(st.session_state.interview_manager.interview_data['questions'])}")
+        current_q = st.session_state.current_question
+        num_questions = len(st.session_state.interview_manager.interview_data["questions"])
+        st.progress(current_q / num_questions)
+        st.write(f"Question {current_q + 1} of {num_questions}")
         
         if st.button("End Interview", type="secondary"):
             st.session_state.interview_stage = 'report'
@@ -84,7 +101,10 @@ if st.session_state.interview_stage == 'setup':
 
 elif st.session_state.interview_stage == 'interview':
     # Interview Screen
-    questions = st.session_state.interview_manager.interview_data["questions"]
+    interview_manager = st.session_state.interview_manager
+    interview_data = interview_manager.interview_data
+    questions = interview_data["questions"]
+    responses = interview_data["responses"]
     current_q = st.session_state.current_question
     
     if current_q < len(questions):
@@ -102,15 +122,16 @@ elif st.session_state.interview_stage == 'interview':
             
             with col_a:
                 if st.button("🎤 Ask Question", key=f"ask_{current_q}"):
-                    st.session_state.interview_manager.ask_question(question_data["question"])
+                    question_audio = interview_manager.ask_question(question_data["question"])
+                    st.audio(question_audio, format="audio/mpeg", autoplay=True)
                     
             with col_b:
                 if st.button("🎙️ Record Answer", key=f"record_{current_q}"):
                     with st.spinner("Recording... Speak now!"):
                         response = asyncio.run(
-                            st.session_state.interview_manager.get_candidate_response()
+                            interview_manager.get_candidate_response()
                         )
-                        st.session_state.interview_manager.interview_data["responses"].append({
+                        responses.append({
                             "question_id": question_data["id"],
                             "response": response
                         })
@@ -123,18 +144,18 @@ elif st.session_state.interview_stage == 'interview':
                     
         with col2:
             st.subheader("Latest Response")
-            if st.session_state.interview_manager.interview_data["responses"]:
-                latest_response = st.session_state.interview_manager.interview_data["responses"][-1]
+            if responses:
+                latest_response = responses[-1]
                 st.text_area("Transcript", latest_response["response"], height=150)
                 
                 # Analyze button
                 if st.button("🔍 Analyze Response"):
                     with st.spinner("Analyzing..."):
-                        analysis = st.session_state.interview_manager.analyze_response(
+                        analysis = interview_manager.analyze_response(
                             question_data["question"],
                             latest_response["response"]
                         )
-                        st.session_state.interview_manager.interview_data["analyses"].append(analysis)
+                        interview_data["analyses"].append(analysis)
                         
                         # Display analysis
                         st.metric("Overall Score", f"{analysis['overall_score']}/10")
@@ -150,8 +171,12 @@ elif st.session_state.interview_stage == 'report':
     # Report Screen
     st.header("Interview Report")
     
-    with st.spinner("Generating comprehensive report..."):
-        report = st.session_state.interview_manager.generate_report()
+    interview_manager = st.session_state.interview_manager
+    # Score once per interview so reruns show the same numbers the narrative was written against
+    if 'report_scores' not in st.session_state:
+        with st.spinner("Scoring interview..."):
+            st.session_state.report_scores = interview_manager.generate_report_scores()
+    report = st.session_state.report_scores
     
     # Display report metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -165,10 +190,6 @@ elif st.session_state.interview_stage == 'report':
     with col4:
         st.metric("Recommendation", report['recommendation'].replace('_', ' ').title())
     
-    # Detailed sections
-    st.subheader("Summary")
-    st.write(report['summary'])
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -181,30 +202,44 @@ elif st.session_state.interview_stage == 'report':
         for area in report['areas_for_improvement']:
             st.write(f"📈 {area}")
     
-    st.subheader("Detailed Feedback")
-    st.write(report['detailed_feedback'])
+    # Narrative sections stream in as Gemini writes them; keep the text so reruns don't regenerate it
+    st.subheader("Summary & Detailed Feedback")
+    if 'report_narrative' not in st.session_state:
+        st.session_state.report_narrative = st.write_stream(interview_manager.stream_summary())
+    else:
+        st.write(st.session_state.report_narrative)
+    # The narrative covers both sections, so the export keeps the baseline's summary field too
+    report = {
+        **report,
+        "summary": st.session_state.report_narrative,
+        "detailed_feedback": st.session_state.report_narrative
+    }
     
     # Question-wise Analysis
     st.subheader("Question-wise Performance")
     
-    analyses_df = []
-    for i, analysis in enumerate(st.session_state.interview_manager.interview_data["analyses"]):
-        analyses_df.append({
-            "Question": i + 1,
-            "Relevance": analysis['relevance_score'],
-            "Clarity": analysis['clarity_score'],
-            "Depth": analysis['depth_score'],
-            "Overall": analysis['overall_score']
-        })
-    
-    df = pd.DataFrame(analyses_df)
+    # Build each column as one array instead of a list of per-row dicts
+    analyses = interview_manager.interview_data["analyses"]
+    score_columns = {
+        "Relevance": "relevance_score",
+        "Clarity": "clarity_score",
+        "Depth": "depth_score",
+        "Overall": "overall_score"
+    }
+    df = pd.DataFrame({
+        "Question": np.arange(1, len(analyses) + 1),
+        **{
+            column: np.fromiter((a[key] for a in analyses), dtype=np.float32, count=len(analyses))
+            for column, key in score_columns.items()
+        }
+    })
     st.dataframe(df, use_container_width=True)
     
     # Export options
     col1, col2 = st.columns(2)
     
     with col1:
-        report_json = json.dumps(report, indent=2)
+        report_json = orjson.dumps(report, option=orjson.OPT_INDENT_2)
         st.download_button(
             "📥 Download Report (JSON)",
             report_json,
@@ -216,6 +251,8 @@ elif st.session_state.interview_stage == 'report':
         if st.button("🔄 New Interview"):
             st.session_state.interview_stage = 'setup'
             st.session_state.current_question = 0
+            st.session_state.pop('report_scores', None)
+            st.session_state.pop('report_narrative', None)
             st.session_state.interview_manager = InterviewManager()
             st.rerun()
 
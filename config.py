@@ -1,29 +1,50 @@
 from dotenv import load_dotenv
+import logging
 import os
 
-# Load environment variables from .env file
-load_dotenv()
+def _load_env():
+    """Load the .env file and snapshot the environment for Config to read"""
+    load_dotenv()
+    return dict(os.environ)
 
 class Config:
     """Configuration class to manage API keys and feature flags"""
     
+    _env = _load_env()
+    
     # API Keys
-    DEEPGRAM_API_KEY = os.getenv('DEEPGRAM_API_KEY')
-    ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY')
-    GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
+    DEEPGRAM_API_KEY = _env.get('DEEPGRAM_API_KEY')
+    ELEVENLABS_API_KEY = _env.get('ELEVENLABS_API_KEY')
+    GOOGLE_API_KEY = _env.get('GOOGLE_API_KEY')
 
     # Model Configuration
-    GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+    GEMINI_MODEL = _env.get('GEMINI_MODEL', 'gemini-1.5-flash')
 
     # ElevenLabs Configuration
-    ELEVENLABS_VOICE_ID = os.getenv('ELEVENLABS_VOICE_ID', 'pNInz6obpgDQGcFmaJgB')  # Default voice ID
+    ELEVENLABS_VOICE_ID = _env.get('ELEVENLABS_VOICE_ID', 'pNInz6obpgDQGcFmaJgB')  # Default voice ID
+    TTS_MAX_CONCURRENCY = int(_env.get('TTS_MAX_CONCURRENCY', '3'))  # Parallel ElevenLabs requests
+    TTS_CACHE_DIR = _env.get('TTS_CACHE_DIR', 'data/tts_cache')  # Synthesized phrases reused across runs
 
     # Audio Configuration
-    SAMPLE_RATE = int(os.getenv('SAMPLE_RATE', '16000'))  # Default 16kHz
-    CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', '1024'))     # Default chunk size
+    SAMPLE_RATE = int(_env.get('SAMPLE_RATE', '16000'))  # Default 16kHz
+    CHUNK_SIZE = int(_env.get('CHUNK_SIZE', '1024'))     # Default chunk size
+
+    # Alternatives requested per batch transcription; drop to 1 if the logged override rate stays under 5%
+    STT_ALTERNATIVES = int(_env.get('STT_ALTERNATIVES', '3'))
+
+    # Maximum number of Gemini requests in flight at once
+    GEMINI_MAX_CONCURRENCY = int(_env.get('GEMINI_MAX_CONCURRENCY', '5'))
+
+    # LLM Response Cache Configuration
+    LLM_CACHE_DIR = _env.get('LLM_CACHE_DIR', 'data/llm_cache')
+    SEMANTIC_CACHE_THRESHOLD = float(_env.get('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+    SEMANTIC_ENCODER_DIR = _env.get('SEMANTIC_ENCODER_DIR', 'data/minilm-onnx')  # int8 ONNX export, if present
 
     # Feature Flags
-    ENABLE_ACCENT_DETECTION = os.getenv('ENABLE_ACCENT_DETECTION', 'false').lower() == 'true'
+    ENABLE_ACCENT_DETECTION = _env.get('ENABLE_ACCENT_DETECTION', 'false').lower() == 'true'
+    ENABLE_LLM_CACHE = _env.get('ENABLE_LLM_CACHE', 'true').lower() == 'true'
+    ENABLE_SEMANTIC_CACHE = _env.get('ENABLE_SEMANTIC_CACHE', 'false').lower() == 'true'
+    SAVE_RECORDINGS = _env.get('SAVE_RECORDINGS', 'false').lower() == 'true'  # Keep uploads in static/audio
 
     @classmethod
     def validate_config(cls):
@@ -38,8 +59,12 @@ class Config:
         if missing_keys:
             raise ValueError(f"Missing required API keys: {', '.join(missing_keys)}")
 
-# Validate configuration on import
-Config.validate_config()
+# Validate configuration on import, warning instead of failing so tooling can import the app
+if not Config._env.get('SKIP_VALIDATE'):
+    try:
+        Config.validate_config()
+    except ValueError as e:
+        logging.warning(str(e))
 
 from config import Config
 
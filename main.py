@@ -1,19 +1,33 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket, BackgroundTasks
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
+from contextlib import asynccontextmanager
 import json
+import orjson
 import asyncio
+import functools
+import hashlib
 import os
+import secrets
+import time
 from datetime import datetime
 
 from utils.interview_manager import InterviewManager
 from models.tts_handler import TTSHandler
 from models.stt_handler import STTHandler
+from config import Config
+from utils.audio_processor import AudioProcessor
 
-app = FastAPI(title="AI Voice Interview Agent", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Close the pooled Deepgram connections on shutdown
+    await stt_handler.aclose()
+
+app = FastAPI(title="AI Voice Interview Agent", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -27,16 +41,73 @@ app.add_middleware(
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Global instances
-interview_manager = InterviewManager()
+# Global instances, created once and shared by every interview
 tts_handler = TTSHandler()
 stt_handler = STTHandler()
+interview_manager = InterviewManager(tts=tts_handler, stt=stt_handler)
 
 # Create audio directory if it doesn't exist
 audio_dir = "static/audio"
 if not os.path.exists(audio_dir):
     os.makedirs(audio_dir)
 
+# Seconds to wait for Deepgram's last results after the browser ends a live transcription
+LIVE_STT_FLUSH_TIMEOUT = 5.0
+
+# Question audio synthesis, keyed by output path so concurrent requests share one job
+tts_tasks = {}
+tts_semaphore = asyncio.Semaphore(Config.TTS_MAX_CONCURRENCY)
+
+def question_audio_path(question):
+    """Deterministic file for a question's audio, so it can be synthesized ahead of time"""
+    digest = hashlib.sha256(f"{Config.ELEVENLABS_VOICE_ID}:{question}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(audio_dir, f"question_{digest}.mp3")
+
+async def synthesize_question_audio(question, audio_path):
+    async with tts_semaphore:
+        # Write to a partial file first so a half-written mp3 is never served
+        partial_path = f"{audio_path}.{secrets.token_hex(3)}.part"
+        try:
+            await asyncio.to_thread(tts_handler.stream_to_file, question, partial_path)
+            os.replace(partial_path, audio_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+def _finish_question_audio(audio_path, task):
+    """Forget a finished synthesis and log its failure, so no exception goes unretrieved"""
+    tts_tasks.pop(audio_path, None)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Question audio synthesis failed: {task.exception()}")
+
+def schedule_question_audio(question):
+    """Start (or join) synthesis of a question's audio; returns None if it's already on disk"""
+    audio_path = question_audio_path(question)
+    if os.path.exists(audio_path):
+        return None
+    task = tts_tasks.get(audio_path)
+    if task is None:
+        task = asyncio.create_task(synthesize_question_audio(question, audio_path))
+        tts_tasks[audio_path] = task
+        task.add_done_callback(functools.partial(_finish_question_audio, audio_path))
+    return task
+
+def stream_question_audio(question, audio_path):
+    """Yield ElevenLabs chunks to the client as they arrive, keeping a copy on disk for next time"""
+    partial_path = f"{audio_path}.{secrets.token_hex(3)}.part"
+    completed = False
+    try:
+        with open(partial_path, "wb") as f:
+            for chunk in tts_handler.text_to_speech_stream(question):
+                f.write(chunk)
+                yield chunk
+        os.replace(partial_path, audio_path)
+        completed = True
+    finally:
+        # Client went away mid-stream: don't leave a truncated file behind
+        if not completed and os.path.exists(partial_path):
+            os.remove(partial_path)
+
 # Pydantic models
 class InterviewSetup(BaseModel):
     job_description: str
@@ -65,9 +136,13 @@ async def setup_interview(setup: InterviewSetup):
     """Setup a new interview with job description and generate questions"""
     try:
         global interview_manager
-        interview_manager = InterviewManager()
+        interview_manager = InterviewManager(tts=tts_handler, stt=stt_handler)
+        
+        questions = await interview_manager.setup_interview_async(setup.job_description, setup.num_questions)
         
-        questions = interview_manager.setup_interview(setup.job_description)
+        # Pre-generate every question's audio in the background so "Ask Question" is a file read
+        for q in questions:
+            schedule_question_audio(q["question"])
         
         return {
             "success": True,
@@ -102,26 +177,49 @@ async def ask_question(question_id: int):
         
         question = questions[question_id]["question"]
         
-        # Generate TTS audio
-        audio_data = tts_handler.text_to_speech(question)
+        # Usually pre-generated at setup; join a synthesis that is still running,
+        # otherwise let the browser stream the audio while it is being synthesized
+        audio_path = question_audio_path(question)
+        task = tts_tasks.get(audio_path)
+        if task is not None:
+            try:
+                await asyncio.shield(task)
+            except Exception as e:
+                # Already logged by _finish_question_audio; the streaming route synthesizes it afresh
+                print(f"Pre-generated audio unavailable, streaming instead: {e}")
         
-        # Save audio file
-        audio_filename = f"question_{question_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3"
-        audio_path = os.path.join(audio_dir, audio_filename)
-        
-        with open(audio_path, "wb") as f:
-            f.write(audio_data)
+        if os.path.exists(audio_path):
+            audio_url = f"/static/audio/{os.path.basename(audio_path)}"
+        else:
+            audio_url = f"/api/question-audio/{question_id}"
         
         return {
             "success": True,
-            "audio_url": f"/static/audio/{audio_filename}",
+            "audio_url": audio_url,
             "question": question
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/question-audio/{question_id}")
+async def question_audio(question_id: int):
+    """Stream a question's speech from ElevenLabs as it is synthesized"""
+    questions = interview_manager.interview_data.get("questions", [])
+    if question_id >= len(questions):
+        raise HTTPException(status_code=404, detail="Question not found")
+    
+    question = questions[question_id]["question"]
+    audio_path = question_audio_path(question)
+    if os.path.exists(audio_path):
+        return FileResponse(audio_path, media_type="audio/mpeg")
+    return StreamingResponse(stream_question_audio(question, audio_path), media_type="audio/mpeg")
+
+def save_recording(audio_path, audio_data):
+    with open(audio_path, "wb") as f:
+        f.write(audio_data)
+
 @app.post("/api/upload-audio")
-async def upload_audio(audio_file: UploadFile = File(...)):
+async def upload_audio(background_tasks: BackgroundTasks, audio_file: UploadFile = File(...)):
     """Upload audio file and convert to text using STT"""
     try:
         # Validate file type
@@ -135,54 +233,36 @@ async def upload_audio(audio_file: UploadFile = File(...)):
         original_filename = audio_file.filename or "audio.wav"
         original_ext = os.path.splitext(original_filename)[1].lower()
         
-        # Save as temporary file first with original extension
-        temp_filename = f"temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}{original_ext}"
-        temp_path = os.path.join(audio_dir, temp_filename)
-        
-        with open(temp_path, "wb") as f:
-            f.write(content)
-        
-        # Convert to proper WAV format using FFmpeg
-        audio_filename = f"response_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-        audio_path = os.path.join(audio_dir, audio_filename)
-        
-        # Use FFmpeg to ensure proper WAV format (PCM 16-bit, mono, 16kHz)
-        import subprocess
-        ffmpeg_cmd = [
-            "ffmpeg", "-y",  # Overwrite output
-            "-i", temp_path,  # Input file
-            "-ar", "16000",  # Sample rate 16kHz
-            "-ac", "1",      # Mono channel
-            "-c:a", "pcm_s16le",  # PCM 16-bit little-endian
-            "-f", "wav",     # WAV format
-            audio_path
-        ]
+        # Decode in memory to proper WAV format (PCM 16-bit, mono, 16kHz)
+        # Random suffix keeps concurrent uploads in the same second from colliding
+        stamp = f"{int(time.time())}_{secrets.token_hex(3)}"
+        audio_path = os.path.join(audio_dir, f"response_{stamp}.wav")
         
         try:
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0 and os.path.exists(audio_path):
-                # Clean up temporary file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                print(f"Audio converted to proper WAV format: {audio_path}")
-            else:
-                # If FFmpeg fails, try to use the original file
-                print(f"FFmpeg conversion failed: {result.stderr}")
-                if os.path.exists(temp_path):
-                    os.rename(temp_path, audio_path)
-                print(f"Using original file format: {audio_path}")
-        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-            print(f"FFmpeg not available: {e}")
-            # Use original file if FFmpeg is not available
-            if os.path.exists(temp_path):
-                os.rename(temp_path, audio_path)
-            print(f"Using original file without conversion: {audio_path}")
-            
+            pcm = await asyncio.to_thread(AudioProcessor.decode_to_pcm16, content)
+            # Don't upload leading/trailing silence to Deepgram
+            pcm = await asyncio.to_thread(AudioProcessor.trim_silence, pcm)
+            audio_data = AudioProcessor.encode_wav(pcm)
+            content_type = "audio/wav"
+            print(f"Audio converted to proper WAV format ({len(audio_data)} bytes)")
+        except Exception as e:
+            # If decoding fails, send the original upload and let Deepgram sniff the format
+            print(f"In-process audio decode failed: {e}")
+            audio_data = content
+            content_type = audio_file.content_type
+            audio_path = os.path.join(audio_dir, f"response_{stamp}{original_ext or '.wav'}")
+            print("Using original file format")
         
-        # Use STT handler to transcribe the audio file
+        # Only touch the disk when recordings are kept, and do it after responding
+        if Config.SAVE_RECORDINGS:
+            background_tasks.add_task(save_recording, audio_path, audio_data)
+        else:
+            audio_path = None
+        
+        # Use STT handler to transcribe the audio
         try:
-            print(f"Starting transcription for file: {audio_path}")
-            transcript = stt_handler.transcribe_audio_file(audio_path)
+            print("Starting transcription for uploaded audio")
+            transcript = await stt_handler.transcribe_audio_buffer_async(audio_data, content_type)
             print(f"Transcription result: {transcript[:100] if transcript else 'None'}...")
             
             # Check for various error conditions
@@ -190,7 +270,7 @@ async def upload_audio(audio_file: UploadFile = File(...)):
                 "Transcription failed", "Network error", "Authentication failed", 
                 "Invalid Deepgram API key", "Audio file not found", "Bad request",
                 "Insufficient credits", "Request timeout", "Connection error",
-                "No transcript found", "Invalid response"
+                "No transcript found", "Invalid response", "No speech detected"
             ]
             
             is_error = any(indicator in transcript for indicator in error_indicators) if transcript else True
@@ -224,6 +304,85 @@ async def upload_audio(audio_file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.websocket("/ws/stt")
+async def stt_stream(websocket: WebSocket):
+    """Relay raw 16 kHz mono PCM from the browser to Deepgram and stream transcripts back"""
+    await websocket.accept()
+    try:
+        deepgram_ws = await stt_handler.open_live_stream()
+    except Exception as e:
+        print(f"Live STT connection failed: {e}")
+        await websocket.send_json({"type": "error", "error": str(e)})
+        await websocket.close()
+        return
+    
+    final_parts = []
+    
+    async def forward_audio():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes"):
+                    await deepgram_ws.send(message["bytes"])
+                elif message.get("text"):
+                    # Client asked to finish, Deepgram flushes the final results and closes
+                    break
+        finally:
+            try:
+                await deepgram_ws.send(json.dumps({"type": "CloseStream"}))
+            except Exception:
+                pass
+    
+    async def forward_transcripts():
+        async for message in deepgram_ws:
+            data = orjson.loads(message)
+            if data.get("type") == "UtteranceEnd":
+                # utterance_end_ms of silence after the last word: the client commits the answer
+                await websocket.send_json({
+                    "type": "utterance_end",
+                    "full_transcript": " ".join(final_parts)
+                })
+                continue
+            alternatives = data.get("channel", {}).get("alternatives") or []
+            if data.get("type") != "Results" or not alternatives:
+                continue
+            transcript = alternatives[0].get("transcript", "").strip()
+            is_final = data.get("is_final", False)
+            if is_final and transcript:
+                final_parts.append(transcript)
+            await websocket.send_json({
+                "type": "transcript",
+                "transcript": transcript,
+                "is_final": is_final,
+                "speech_final": data.get("speech_final", False),
+                "full_transcript": " ".join(final_parts)
+            })
+    
+    try:
+        await websocket.send_json({"type": "ready"})
+        audio_task = asyncio.create_task(forward_audio())
+        transcript_task = asyncio.create_task(forward_transcripts())
+        await asyncio.wait({audio_task, transcript_task}, return_when=asyncio.FIRST_COMPLETED)
+        if audio_task.done() and not transcript_task.done():
+            # Client finished: give Deepgram a moment to flush the last finals after CloseStream
+            await asyncio.wait({transcript_task}, timeout=LIVE_STT_FLUSH_TIMEOUT)
+        # Whichever side is still running has nothing left to relay; stop it and retrieve
+        # both tasks' exceptions so none goes unobserved
+        for task in (audio_task, transcript_task):
+            task.cancel()
+        for result in await asyncio.gather(audio_task, transcript_task, return_exceptions=True):
+            if isinstance(result, Exception):
+                print(f"Live STT relay task failed: {result}")
+        await websocket.send_json({"type": "final", "transcript": " ".join(final_parts)})
+        await websocket.close()
+    except Exception as e:
+        # The browser may already be gone; nothing left to deliver
+        print(f"Live STT stream ended: {e}")
+    finally:
+        await deepgram_ws.close()
+
 @app.post("/api/submit-response")
 async def submit_response(response: QuestionResponse):
     """Submit a response for a question"""
@@ -246,7 +405,7 @@ async def submit_response(response: QuestionResponse):
 async def analyze_response(analysis_request: AnalysisRequest):
     """Analyze a candidate's response"""
     try:
-        analysis = interview_manager.analyze_response(
+        analysis = await interview_manager.analyze_response_async(
             analysis_request.question,
             analysis_request.response
         )
@@ -261,11 +420,23 @@ async def analyze_response(analysis_request: AnalysisRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/analyze-all")
+async def analyze_all():
+    """Analyze all submitted responses concurrently"""
+    try:
+        analyses = await interview_manager.analyze_all_responses_async()
+        return {
+            "success": True,
+            "analyses": analyses
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/generate-report")
 async def generate_report():
     """Generate comprehensive interview report"""
     try:
-        report = interview_manager.generate_report()
+        report = await interview_manager.generate_report_async()
         return {
             "success": True,
             "report": report
@@ -278,7 +449,7 @@ async def reset_interview():
     """Reset interview to start fresh"""
     try:
         global interview_manager
-        interview_manager = InterviewManager()
+        interview_manager = InterviewManager(tts=tts_handler, stt=stt_handler)
         return {
             "success": True,
             "message": "Interview reset successfully"
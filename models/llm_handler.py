@@ -1,13 +1,87 @@
 import google.generativeai as genai
 from config import Config
-import json
+from utils.llm_cache import LLMCache
+import orjson
 import logging
+import os
 import re
+from typing import List
+# google-generativeai builds pydantic models from these, which needs typing_extensions' TypedDict before 3.12
+from typing_extensions import TypedDict
+
+# Response schemas enforced server-side by Gemini's JSON mode
+class InterviewQuestion(TypedDict):
+    id: int
+    question: str
+    skill_area: str
+    difficulty: str
+
+class InterviewQuestions(TypedDict):
+    questions: List[InterviewQuestion]
+
+class AnswerAnalysis(TypedDict):
+    relevance_score: int
+    clarity_score: int
+    depth_score: int
+    overall_score: int
+    strengths: List[str]
+    weaknesses: List[str]
+    feedback: str
+    follow_up_question: str
+
+class FinalReport(TypedDict):
+    overall_rating: int
+    recommendation: str
+    summary: str
+    strengths: List[str]
+    areas_for_improvement: List[str]
+    technical_competency: int
+    communication_skills: int
+    cultural_fit: int
+    detailed_feedback: str
+
+class ReportScores(TypedDict):
+    overall_rating: int
+    recommendation: str
+    strengths: List[str]
+    areas_for_improvement: List[str]
+    technical_competency: int
+    communication_skills: int
+    cultural_fit: int
+
+# Limits for the interview data embedded in the final report prompt
+_MAX_REPORT_RESPONSE_CHARS = 800
+_SCORE_KEYS = ("relevance_score", "clarity_score", "depth_score", "overall_score")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+_response_cache = None
+
+def _get_response_cache():
+    """Share one response cache between all handlers in the process"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = LLMCache(
+            os.path.join(Config.LLM_CACHE_DIR, Config.GEMINI_MODEL),
+            enable_semantic=Config.ENABLE_SEMANTIC_CACHE,
+            threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+            encoder_dir=Config.SEMANTIC_ENCODER_DIR
+        )
+    return _response_cache
 
 class LLMHandler:
+    _MODEL = None
+
+    @classmethod
+    def _get_model(cls):
+        """Configure Gemini and build the model once per process, not once per handler"""
+        if cls._MODEL is None:
+            genai.configure(api_key=Config.GOOGLE_API_KEY)
+            cls._MODEL = genai.GenerativeModel(Config.GEMINI_MODEL)
+        return cls._MODEL
+
     def __init__(self):
-        genai.configure(api_key=Config.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
+        self.model = self._get_model()
+        self.cache = _get_response_cache() if Config.ENABLE_LLM_CACHE else None
         
     def _extract_text(self, response):
         # Safely extract the text from Gemini response
@@ -19,15 +93,79 @@ class LLMHandler:
 
     def _strip_markdown_codeblock(self, text):
         # Remove triple backtick code block and optional 'json' label
-        pattern = r"^```(?:json)?\s*([\s\S]*?)\s*```$"
-        match = re.match(pattern, text.strip(), re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-        return text.strip()
+        text = text.strip()
+        if not text.startswith("```"):
+            return text
+        end = text.rfind("```")
+        if end <= 3:
+            return text
+        body = text[3:end]
+        if body[:4].lower() == "json":
+            body = body[4:]
+        return body.strip()
 
-    def generate_interview_questions(self, job_description, num_questions=5):
-        """Generate interview questions based on job description"""
-        prompt = f"""
+    def _parse_json(self, text):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+        # JSON mode returns bare JSON; fenced output only comes from older cache entries
+        stripped = self._strip_markdown_codeblock(text)
+        try:
+            return orjson.loads(stripped)
+        except Exception as e:
+            logging.error(f"JSON decode error: {e}\nRaw output: {text}")
+            raise ValueError(f"Failed to parse Gemini output as JSON. Raw output: {text}")
+
+    def _json_config(self, schema):
+        return genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=schema
+        )
+
+    def _cache_lookup(self, prompt, context=None, semantic_text=None):
+        if self.cache is None:
+            return None, None, None
+        return self.cache.get(prompt, context, semantic_text)
+
+    def _parse_and_cache(self, key, prompt, response, embedding, context=None):
+        text = self._extract_text(response)
+        result = self._parse_json(text)
+        # Only cache answers that parsed, so a bad response is retried next time
+        if self.cache is not None:
+            self.cache.put(key, prompt, text, embedding, context)
+        return result
+
+    def _cached_json(self, prompt, schema, context=None, semantic_text=None):
+        """Return the parsed JSON answer for a prompt, calling Gemini only on a cache miss
+
+        Near-duplicate matching only happens between prompts with the same `context`,
+        comparing their `semantic_text`; without them only exact repeats are cached.
+        """
+        key, text, embedding = self._cache_lookup(prompt, context, semantic_text)
+        if text is not None:
+            return self._parse_json(text)
+        response = self.model.generate_content(prompt, generation_config=self._json_config(schema))
+        return self._parse_and_cache(key, prompt, response, embedding, context)
+
+    async def _cached_json_async(self, prompt, schema, context=None, semantic_text=None):
+        """Async variant of _cached_json that doesn't block the event loop while Gemini works"""
+        key, text, embedding = self._cache_lookup(prompt, context, semantic_text)
+        if text is not None:
+            return self._parse_json(text)
+        response = await self.model.generate_content_async(prompt, generation_config=self._json_config(schema))
+        return self._parse_and_cache(key, prompt, response, embedding, context)
+
+    def _questions_cache_scope(self, job_description, num_questions):
+        # Similar job descriptions share questions, but only for the same question count
+        return LLMCache.make_context("questions", num_questions), job_description
+
+    def _analysis_cache_scope(self, question, answer, job_description):
+        # Paraphrased answers share an analysis, but only for the same job description
+        return LLMCache.make_context("analysis", job_description), f"{question}\n{answer}"
+
+    def _questions_prompt(self, job_description, num_questions):
+        return f"""
         You are an expert interviewer. Based on the following job description, generate {num_questions} 
         relevant theoretical interview questions that will help assess the candidate's suitability for the role.
         Ensure the questions evaluate conceptual understanding, problem-solving approach,
@@ -44,19 +182,9 @@ class LLMHandler:
             ]
         }}
         """
-        
-        response = self.model.generate_content(prompt)
-        text = self._extract_text(response)
-        text = self._strip_markdown_codeblock(text)
-        try:
-            return json.loads(text)
-        except Exception as e:
-            logging.error(f"JSON decode error: {e}\nRaw output: {text}")
-            raise ValueError(f"Failed to parse Gemini output as JSON. Raw output: {text}")
     
-    def analyze_answer(self, question, answer, job_description):
-        """Analyze candidate's answer"""
-        prompt = f"""
+    def _analysis_prompt(self, question, answer, job_description):
+        return f"""
         As an expert interviewer, analyze the following answer provided by a candidate.
         
         Job Description: {job_description}
@@ -75,23 +203,42 @@ class LLMHandler:
             "follow_up_question": "..."
         }}
         """
-        
-        response = self.model.generate_content(prompt)
-        text = self._extract_text(response)
-        text = self._strip_markdown_codeblock(text)
-        try:
-            return json.loads(text)
-        except Exception as e:
-            logging.error(f"JSON decode error: {e}\nRaw output: {text}")
-            raise ValueError(f"Failed to parse Gemini output as JSON. Raw output: {text}")
     
-    def generate_final_report(self, interview_data):
-        """Generate comprehensive interview report"""
-        prompt = f"""
+    def _compact_interview_data(self, interview_data):
+        """Keep only what the report needs: questions, truncated answers, scores and one-line feedback"""
+        analyses = []
+        for analysis in interview_data.get("analyses", []):
+            compact = {key: analysis[key] for key in _SCORE_KEYS if key in analysis}
+            feedback = analysis.get("feedback")
+            if feedback:
+                compact["feedback"] = _SENTENCE_END_RE.split(feedback.strip(), maxsplit=1)[0]
+            analyses.append(compact)
+
+        return {
+            "job_description": interview_data.get("job_description", ""),
+            "questions": [
+                {key: q[key] for key in ("question", "skill_area", "difficulty") if key in q}
+                for q in interview_data.get("questions", [])
+            ],
+            "responses": [
+                {
+                    "question_id": r.get("question_id"),
+                    "response": (r.get("response") or "")[:_MAX_REPORT_RESPONSE_CHARS]
+                }
+                for r in interview_data.get("responses", [])
+            ],
+            "analyses": analyses
+        }
+
+    def _report_data(self, interview_data):
+        return orjson.dumps(self._compact_interview_data(interview_data)).decode()
+
+    def _report_prompt(self, interview_data):
+        return f"""
         Based on the interview data below, generate a comprehensive evaluation report and recommendations for the candidate.
         
         Interview Data:
-        {json.dumps(interview_data, indent=2)}
+        {self._report_data(interview_data)}
         
         Provide a detailed report in JSON format:
         {{
@@ -106,12 +253,87 @@ class LLMHandler:
             "detailed_feedback": "..."
         }}
         """
+
+    def _report_scores_prompt(self, interview_data):
+        return f"""
+        Based on the interview data below, score the candidate and list their strengths and areas for improvement.
         
-        response = self.model.generate_content(prompt)
-        text = self._extract_text(response)
-        text = self._strip_markdown_codeblock(text)
-        try:
-            return json.loads(text)
-        except Exception as e:
-            logging.error(f"JSON decode error: {e}\nRaw output: {text}")
-            raise ValueError(f"Failed to parse Gemini output as JSON. Raw output: {text}")
\ No newline at end of file
+        Interview Data:
+        {self._report_data(interview_data)}
+        
+        Provide the scores in JSON format:
+        {{
+            "overall_rating": 0-10,
+            "recommendation": "strong_yes/yes/maybe/no",
+            "strengths": ["..."],
+            "areas_for_improvement": ["..."],
+            "technical_competency": 0-10,
+            "communication_skills": 0-10,
+            "cultural_fit": 0-10
+        }}
+        """
+
+    def _report_narrative_prompt(self, interview_data):
+        return f"""
+        Based on the interview data below, write the narrative part of the candidate's evaluation report:
+        a short summary paragraph followed by detailed feedback on each answer. Reply in plain markdown, not JSON.
+        
+        Interview Data:
+        {self._report_data(interview_data)}
+        """
+
+    def generate_interview_questions(self, job_description, num_questions=5):
+        """Generate interview questions based on job description"""
+        return self._cached_json(
+            self._questions_prompt(job_description, num_questions), InterviewQuestions,
+            *self._questions_cache_scope(job_description, num_questions)
+        )
+
+    async def generate_interview_questions_async(self, job_description, num_questions=5):
+        """Generate interview questions without blocking the event loop"""
+        return await self._cached_json_async(
+            self._questions_prompt(job_description, num_questions), InterviewQuestions,
+            *self._questions_cache_scope(job_description, num_questions)
+        )
+    
+    def analyze_answer(self, question, answer, job_description):
+        """Analyze candidate's answer"""
+        return self._cached_json(
+            self._analysis_prompt(question, answer, job_description), AnswerAnalysis,
+            *self._analysis_cache_scope(question, answer, job_description)
+        )
+
+    async def analyze_answer_async(self, question, answer, job_description):
+        """Analyze candidate's answer without blocking the event loop"""
+        return await self._cached_json_async(
+            self._analysis_prompt(question, answer, job_description), AnswerAnalysis,
+            *self._analysis_cache_scope(question, answer, job_description)
+        )
+    
+    def generate_final_report(self, interview_data):
+        """Generate comprehensive interview report"""
+        return self._cached_json(self._report_prompt(interview_data), FinalReport)
+
+    async def generate_final_report_async(self, interview_data):
+        """Generate comprehensive interview report without blocking the event loop"""
+        return await self._cached_json_async(self._report_prompt(interview_data), FinalReport)
+
+    def generate_report_scores(self, interview_data):
+        """Generate only the structured part of the report (scores, strengths, recommendation)"""
+        return self._cached_json(self._report_scores_prompt(interview_data), ReportScores)
+
+    def stream_report_narrative(self, interview_data):
+        """Yield the report summary and detailed feedback as Gemini produces it"""
+        prompt = self._report_narrative_prompt(interview_data)
+        key, text, embedding = self._cache_lookup(prompt)
+        if text is not None:
+            yield text
+            return
+        parts = []
+        for chunk in self.model.generate_content(prompt, stream=True):
+            chunk_text = self._extract_text(chunk)
+            if chunk_text:
+                parts.append(chunk_text)
+                yield chunk_text
+        if self.cache is not None and parts:
+            self.cache.put(key, prompt, "".join(parts), embedding)
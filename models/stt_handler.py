@@ -1,37 +1,260 @@
 import asyncio
 import websockets
+import io
 import json
+import orjson
 import base64
 from config import Config
+from utils.audio_processor import AudioProcessor
 import pyaudio
-import threading
-import queue
-import requests
+import httpx
 import os
 import wave
 import tempfile
 import subprocess
 import shutil
 import time
+import random
+import functools
+from collections import namedtuple
+import hashlib
+import re
+from urllib.parse import urlencode
 import logging
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception_type
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEEPGRAM_LISTEN_URL = "https://api.deepgram.com/v1/listen"
+
+# Number of accent detection / file validation results remembered per handler
+ACCENT_CACHE_SIZE = 256
+
+# Largest WebSocket frame built from queued microphone chunks (~256 ms of 16 kHz PCM)
+MAX_SEND_BATCH_BYTES = 8192
+
+# Mean absolute 16-bit amplitude per window below which audio counts as silence; a recording
+# is only skipped (never uploaded) when every window is silent
+SILENCE_THRESHOLD = 300
+SILENCE_WINDOW_SECONDS = 0.25
+
+# Endpointing sent with pre-recorded transcriptions, per detected accent
+ENDPOINTING_MS = {
+    "default": "150",
+    "indian": "250",
+    "british": "150",
+    "australian": "200",
+    "south_african": "250"
+}
+
+# Clean parameters for pre-recorded Nova-3 transcription (no deprecated parameters);
+# language, alternatives and the accent-specific entries below are filled in per request
+TRANSCRIPTION_PARAMS = {
+    "model": "nova-3",
+    "smart_format": "true",
+    "punctuate": "true",
+    "confidence": "true",
+    "filler_words": "true",
+    "numerals": "true",
+    "interim_results": "false",
+    "encoding": "linear16",
+    "sample_rate": "16000",
+    "channels": "1"
+}
+ACCENT_PARAMS = {
+    "indian": {"endpointing": ENDPOINTING_MS["indian"], "tier": "enhanced"},
+    "british": {"endpointing": ENDPOINTING_MS["british"]},
+    "australian": {"endpointing": ENDPOINTING_MS["australian"]},
+    "south_african": {"endpointing": ENDPOINTING_MS["south_african"]}
+}
+DEFAULT_ACCENT_PARAMS = {"endpointing": ENDPOINTING_MS["default"]}
+
+# Upload content type per supported audio file extension
+CONTENT_TYPE_MAP = {
+    '.wav': 'audio/wav',
+    '.mp3': 'audio/mpeg',
+    '.webm': 'audio/webm',
+    '.m4a': 'audio/mp4',
+    '.ogg': 'audio/ogg',
+    '.flac': 'audio/flac'
+}
+
+# Words that suggest an alternative is an on-topic interview answer
+INTERVIEW_KEYWORDS = frozenset({
+    'experience', 'skills', 'position', 'job', 'work', 'company', 'role', 'responsibility',
+    'qualification', 'background', 'education', 'training', 'project', 'team', 'leadership',
+    'management', 'communication', 'problem', 'solution', 'achievement', 'challenge', 'goal',
+    'strength', 'weakness', 'motivation', 'career', 'development'
+})
+
+_WavHeader = namedtuple("_WavHeader", "rate channels width nframes")
+
+@functools.lru_cache(maxsize=64)
+def _read_wav_header(path, mtime_ns, size):
+    try:
+        with wave.open(path, "rb") as wav_file:
+            return _WavHeader(wav_file.getframerate(), wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getnframes())
+    except (wave.Error, EOFError, OSError):
+        return None
+
+def _probe_wav(path):
+    """Parsed WAV header of `path` (cached per path, mtime and size), or None if it isn't a readable WAV"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _read_wav_header(path, stat.st_mtime_ns, stat.st_size)
+
+# Terms boosted on live streams when accent detection is enabled
+LIVE_KEYTERMS = ('interview', 'resume', 'experience', 'education', 'skills')
+
+@functools.lru_cache(maxsize=8)
+def _build_live_url(language, model, accent_detection):
+    """Build the Deepgram live URL once per (language, model, accent detection) combination"""
+    # Base parameters
+    params = {
+        'encoding': 'linear16',
+        'sample_rate': '16000',
+        'channels': '1',
+        'language': language,
+        'model': model,
+        'punctuate': 'true',
+        'smart_format': 'true',
+        'filler_words': 'false',
+        'profanity_filter': 'true',
+        'redact': 'false',
+        'alternatives': '1',
+        'numerals': 'true',
+        'diarize': 'false',
+        # Interim results are required for UtteranceEnd, which ends the turn; endpointing only splits finals
+        'interim_results': 'true',
+        'endpointing': '200',
+        'utterance_end_ms': '1000'
+    }
+
+    # Only enable advanced features if accent detection is on
+    if accent_detection:
+        if model.startswith('nova-3'):
+            # Nova-3 takes key terms instead of the older tier/keywords boosting
+            params['keyterm'] = LIVE_KEYTERMS
+        else:
+            params.update({
+                'tier': 'enhanced',
+                'keywords': ','.join(LIVE_KEYTERMS),
+                'keywords_threshold': '0.5'
+            })
+
+    # Build query string
+    query_string = urlencode(params, doseq=True)
+    return f'wss://api.deepgram.com/v1/listen?{query_string}'
+
+# Pattern indicators for different accent types
+ACCENT_KEYWORDS = {
+    "indian": ["actually", "basically", "definitely", "obviously", "totally", "really", "very much", "good", "nice", "excellent"],
+    "british": ["quite", "rather", "brilliant", "lovely", "proper", "indeed", "certainly", "absolutely", "whilst", "amongst"],
+    "australian": ["mate", "fair dinkum", "no worries", "good on you", "she'll be right", "reckon", "heaps", "bloody"],
+    "american": ["awesome", "cool", "dude", "totally", "like", "you know", "whatever", "basically", "literally"],
+    "canadian": ["eh", "about", "house", "out", "sorry", "aboot", "hoose", "oot"],
+    "south_african": ["ja", "now now", "just now", "shame", "lekker", "boet", "howzit"]
+}
+
+# keyword -> accents it counts towards (some keywords are shared between accents)
+_ACCENT_KEYWORD_INDEX = {}
+for _accent, _keywords in ACCENT_KEYWORDS.items():
+    for _keyword in _keywords:
+        _ACCENT_KEYWORD_INDEX.setdefault(_keyword, []).append(_accent)
+
+def _build_accent_automaton():
+    """Build one Aho-Corasick automaton matching every accent keyword in a single pass"""
+    try:
+        import ahocorasick
+    except ImportError:
+        logger.info("pyahocorasick not installed, accent keywords will be scanned one by one")
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword, accents in _ACCENT_KEYWORD_INDEX.items():
+        automaton.add_word(keyword, (keyword, accents))
+    automaton.make_automaton()
+    return automaton
+
+_ACCENT_AUTOMATON = _build_accent_automaton()
+
+# Phrases Deepgram tends to produce for music, noise or silence rather than speech
+_HALLUCINATION_PATTERNS = [
+    "thank you for watching",
+    "subscribe to my channel",
+    "like and subscribe",
+    "please subscribe",
+    "music playing",
+    "background music",
+    "applause",
+    "laughter",
+    "silence",
+    "[music]",
+    "[applause]",
+    "[laughter]"
+]
+_HALLUCINATION_RE = re.compile("|".join(re.escape(pattern) for pattern in _HALLUCINATION_PATTERNS))
+_HALLUCINATION_FIRST_WORDS = frozenset(pattern.split()[0] for pattern in _HALLUCINATION_PATTERNS)
+# Words plus bracketed tags such as "[music]", matching how the patterns above split
+_WORD_RE = re.compile(r"\[[a-z']+\]|[a-z']+")
+
 class STTHandler:
     def __init__(self):
         self.api_key = Config.DEEPGRAM_API_KEY
         self.websocket = None
-        self.audio_queue = queue.Queue()
+        # Created in start_recording, once there is a running event loop to bind to
+        self.audio_queue = None
+        self._loop = None
+        self._pyaudio = None
+        self._mic_stream = None
+        # Reused for every coalesced WebSocket frame in send_audio
+        self._send_buffer = bytearray(MAX_SEND_BATCH_BYTES + Config.CHUNK_SIZE * 2)
+        # Set while self.websocket is connected, so hot loops don't query the socket state
+        self._ws_open = asyncio.Event()
+        # Set when Deepgram reports the end of the candidate's utterance (or recording stops)
+        self._done = asyncio.Event()
         self.is_recording = False
-        self.transcript = ""
+        self._transcript_parts = []
+        # Latest interim result, replaced until Deepgram finalizes that stretch of audio
+        self._interim_transcript = ""
+        # Resolve the ffmpeg tools once; None means fall back to in-process handling
+        self._ffmpeg = shutil.which("ffmpeg")
+        self._ffprobe = shutil.which("ffprobe")
+        # validate_audio_file results per (path, size, mtime)
+        self._validation_cache = {}
+        # (language, accent) per audio fingerprint, so the same recording is only sent once
+        self._accent_cache = {}
+        # Transcriptions scored, and how many picked an alternative other than Deepgram's first
+        self._alternative_picks = 0
+        self._alternative_overrides = 0
         self.enable_accent_detection = getattr(Config, 'ENABLE_ACCENT_DETECTION', False)  # Default to False
+        # Keep-alive HTTP/2 client shared by accent detection and transcription,
+        # so repeated REST calls skip the TCP + TLS handshake
+        self.session = httpx.Client(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=4, max_connections=8)
+        )
+        # HTTP/2 AsyncClient for transcriptions awaited from the FastAPI event loop, created on first use
+        self._async_session = None
+        self._headers = [
+            ('Authorization', f'Token {self.api_key}'),
+            ('User-Agent', 'JD-Interview-App/1.0')
+        ]
+        
+    @property
+    def transcript(self):
+        """Transcript received so far in the current recording, including any pending interim segment"""
+        if self._interim_transcript:
+            return " ".join(self._transcript_parts + [self._interim_transcript])
+        return " ".join(self._transcript_parts)
         
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
+        wait=wait_exponential_jitter(initial=1, max=10),
         retry=retry_if_exception_type((
             websockets.exceptions.ConnectionClosedError,
             ConnectionError,
@@ -42,53 +265,20 @@ class STTHandler:
             f"Retrying connection (attempt {retry_state.attempt_number}): {str(retry_state.outcome.exception())}"
         )
     )
-    async def connect_deepgram(self, language="en", model="nova-2"):
+    async def connect_deepgram(self, language="en", model="nova-3"):
         """Connect to Deepgram WebSocket with optimized parameters and retry logic"""
         if not self.api_key:
             raise ValueError("Deepgram API key is not configured")
             
-        # Base parameters
-        params = {
-            'encoding': 'linear16',
-            'sample_rate': '16000',
-            'channels': '1',
-            'language': language,
-            'model': model,
-            'punctuate': 'true',
-            'smart_format': 'true',
-            'filler_words': 'false',
-            'profanity_filter': 'true',
-            'redact': 'false',
-            'alternatives': '1',
-            'numerals': 'true',
-            'diarize': 'false',
-            'endpointing': '200',
-            'utterance_end_ms': '1000'
-        }
-        
-        # Only enable advanced features if accent detection is on
-        if self.enable_accent_detection:
-            params.update({
-                'tier': 'enhanced',
-                'keywords': 'interview,resume,experience,education,skills',
-                'keywords_threshold': '0.5'
-            })
-        
-        # Build query string
-        query_string = '&'.join(f"{k}={v}" for k, v in params.items())
-        
-        # Create headers
-        headers = [
-            ('Authorization', f'Token {self.api_key}'),
-            ('User-Agent', 'JD-Interview-App/1.0')
-        ]
+        url = _build_live_url(language, model, self.enable_accent_detection)
         
+        self._ws_open.clear()
         try:
             # Connect with proper headers and parameters
             self.websocket = await asyncio.wait_for(
                 websockets.connect(
-                    f'wss://api.deepgram.com/v1/listen?{query_string}',
-                    additional_headers=headers,
+                    url,
+                    additional_headers=self._headers,
                     ping_interval=30,
                     ping_timeout=30,
                     close_timeout=10,
@@ -96,6 +286,7 @@ class STTHandler:
                 ),
                 timeout=10.0  # 10 seconds connection timeout
             )
+            self._ws_open.set()
             logger.info("Successfully connected to Deepgram API")
             return self.websocket
             
@@ -121,37 +312,82 @@ class STTHandler:
             logger.error(f"Unexpected error connecting to Deepgram: {str(e)}")
             raise
         
+    async def open_live_stream(self, language="en", model="nova-3"):
+        """Open a dedicated Deepgram live connection for 16 kHz mono PCM relayed from a client"""
+        if not self.api_key:
+            raise ValueError("Deepgram API key is not configured")
+        
+        try:
+            websocket = await asyncio.wait_for(
+                # Same streaming configuration as the microphone path
+                websockets.connect(
+                    _build_live_url(language, model, self.enable_accent_detection),
+                    additional_headers=self._headers,
+                    ping_interval=30,
+                    ping_timeout=30,
+                    close_timeout=10,
+                    max_size=None
+                ),
+                timeout=10.0
+            )
+        except asyncio.TimeoutError:
+            logger.error("Connection to Deepgram API timed out")
+            raise ConnectionError("Connection to Deepgram API timed out")
+        logger.info("Opened Deepgram live stream")
+        return websocket
+        
     async def send_audio(self):
         """Send audio data to Deepgram with error handling"""
-        consecutive_errors = 0
-        max_consecutive_errors = 3
-        
         while self.is_recording:
             try:
-                if not self.audio_queue.empty():
-                    audio_data = self.audio_queue.get()
-                    if self.websocket and not self.websocket.closed:
-                        await self.websocket.send(audio_data)
-                        consecutive_errors = 0  # Reset on successful send
+                audio_data = await self.audio_queue.get()
+                if audio_data is None:  # Recorder thread has stopped
+                    break
+                
+                # Coalesce whatever else is already queued into one frame, up to the batch cap,
+                # copying into the reusable send buffer instead of joining into a new bytes object
+                first_chunk = audio_data
+                buffer = self._send_buffer
+                batch_size = 0
+                finished = False
+                while batch_size < MAX_SEND_BATCH_BYTES:
+                    try:
+                        audio_data = self.audio_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if audio_data is None:
+                        finished = True
+                        break
+                    if batch_size == 0:
+                        buffer[:len(first_chunk)] = first_chunk
+                        batch_size = len(first_chunk)
+                    buffer[batch_size:batch_size + len(audio_data)] = audio_data
+                    batch_size += len(audio_data)
+                
+                if self._ws_open.is_set():
+                    if batch_size == 0:
+                        await self.websocket.send(first_chunk)
                     else:
-                        logger.warning("WebSocket connection is closed. Attempting to reconnect...")
-                        await self.connect_deepgram()
-                        
-                await asyncio.sleep(0.01)
+                        # Client frames are masked into a new payload, so the buffer is free once send returns
+                        with memoryview(buffer) as view, view[:batch_size] as frame:
+                            await self.websocket.send(frame)
+                elif finished or not self.is_recording:
+                    # stop_recording closed the socket; drop the tail instead of reconnecting
+                    break
+                else:
+                    logger.warning("WebSocket connection is closed. Attempting to reconnect...")
+                    await self.connect_deepgram()
+                if finished:
+                    break
                 
             except (websockets.exceptions.ConnectionClosed, ConnectionError) as e:
-                consecutive_errors += 1
-                logger.warning(f"Connection error (attempt {consecutive_errors}/{max_consecutive_errors}): {str(e)}")
-                
-                if consecutive_errors >= max_consecutive_errors:
-                    logger.error("Max connection retries reached. Stopping audio send.")
-                    self.is_recording = False
+                self._ws_open.clear()
+                if not self.is_recording:
                     break
-                    
-                # Exponential backoff before retry
-                await asyncio.sleep(min(2 ** consecutive_errors, 10))  # Cap at 10 seconds
+                logger.warning(f"Connection error while sending audio: {str(e)}")
                 
                 try:
+                    # connect_deepgram carries the retry policy itself
                     await self.connect_deepgram()
                 except Exception as reconnect_error:
                     logger.error(f"Failed to reconnect: {str(reconnect_error)}")
@@ -167,37 +403,50 @@ class STTHandler:
         """Receive transcription from Deepgram with error handling"""
         while self.is_recording:
             try:
-                if not self.websocket or self.websocket.closed:
+                if not self._ws_open.is_set():
                     logger.warning("WebSocket not connected. Attempting to reconnect...")
                     await self.connect_deepgram()
                     continue
                     
-                message = await asyncio.wait_for(self.websocket.recv(), timeout=30.0)
-                data = json.loads(message)
-                
-                # Handle different response types
-                if 'error' in data:
-                    logger.error(f"Deepgram API error: {data['error']}")
-                    continue
+                # Keepalive and dead-peer detection come from the connection's ping_interval
+                async for message in self.websocket:
+                    if not self.is_recording:
+                        break
+                    try:
+                        data = orjson.loads(message)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"Failed to parse Deepgram response: {str(e)}")
+                        continue
                     
-                if 'channel' in data and 'alternatives' in data['channel'] and data['channel']['alternatives']:
-                    transcript = data['channel']['alternatives'][0].get('transcript', '').strip()
-                    if transcript:
-                        self.transcript += transcript + " "
-                        logger.debug(f"Received transcript: {transcript}")
+                    # Handle different response types
+                    if 'error' in data:
+                        logger.error(f"Deepgram API error: {data['error']}")
+                        continue
                         
-            except asyncio.TimeoutError:
-                logger.warning("No message received from Deepgram for 30 seconds")
-                # Send a ping to check connection
-                try:
-                    if self.websocket and not self.websocket.closed:
-                        await self.websocket.ping()
-                except Exception as e:
-                    logger.error(f"Ping failed: {str(e)}")
-                    self.is_recording = False
-                    break
+                    if 'channel' in data and 'alternatives' in data['channel'] and data['channel']['alternatives']:
+                        transcript = data['channel']['alternatives'][0].get('transcript', '').strip()
+                        if not data.get('is_final'):
+                            # Interim results are revised until the final for the same audio arrives
+                            self._interim_transcript = transcript
+                        else:
+                            self._interim_transcript = ""
+                            if transcript:
+                                self._transcript_parts.append(transcript)
+                                logger.debug(f"Received transcript: {transcript}")
+                    
+                    # A second of silence after the last word (utterance_end_ms) ends the answer and wakes
+                    # get_candidate_response; speech_final fires on every short pause, so it doesn't
+                    if data.get('type') == 'UtteranceEnd':
+                        if self._transcript_parts or self._interim_transcript:
+                            self._done.set()
+                else:
+                    # Server closed the stream cleanly; reconnect on the next pass if still recording
+                    self._ws_open.clear()
                     
             except (websockets.exceptions.ConnectionClosed, ConnectionError) as e:
+                self._ws_open.clear()
+                if not self.is_recording:
+                    break
                 logger.error(f"Connection closed while receiving: {str(e)}")
                 try:
                     await self.connect_deepgram()
@@ -206,40 +455,66 @@ class STTHandler:
                     self.is_recording = False
                     break
                     
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse Deepgram response: {str(e)}")
-                
             except Exception as e:
                 logger.error(f"Error in receive_transcript: {str(e)}")
                 self.is_recording = False
                 break
                     
+    def _enqueue_audio(self, data):
+        """Queue a recorded chunk on the event loop, dropping it if the sender has fallen behind"""
+        try:
+            self.audio_queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning("Audio queue full, dropping chunk")
+
+    def _end_audio(self):
+        """Wake send_audio with the end-of-recording marker, making room for it if needed"""
+        if self.audio_queue.full():
+            self.audio_queue.get_nowait()
+        self.audio_queue.put_nowait(None)
+
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio callback, runs on PortAudio's thread for every captured buffer"""
+        if not self.is_recording:
+            return (None, pyaudio.paComplete)
+        self._loop.call_soon_threadsafe(self._enqueue_audio, in_data)
+        return (None, pyaudio.paContinue)
+
     def record_audio(self):
-        """Record audio from microphone"""
-        p = pyaudio.PyAudio()
-        stream = p.open(
+        """Start recording from the microphone; PortAudio delivers buffers to _pa_callback"""
+        self._pyaudio = pyaudio.PyAudio()
+        self._mic_stream = self._pyaudio.open(
             format=pyaudio.paInt16,
             channels=1,
             rate=Config.SAMPLE_RATE,
             input=True,
-            frames_per_buffer=Config.CHUNK_SIZE
+            frames_per_buffer=Config.CHUNK_SIZE,
+            stream_callback=self._pa_callback
         )
+        self._mic_stream.start_stream()
+
+    def _close_microphone(self):
+        """Stop the microphone stream and tell send_audio there is nothing more to send"""
+        if self._mic_stream is not None:
+            self._mic_stream.stop_stream()
+            self._mic_stream.close()
+            self._pyaudio.terminate()
+            self._mic_stream = None
+            self._pyaudio = None
+        if self.audio_queue is not None:
+            self._end_audio()
         
-        while self.is_recording:
-            data = stream.read(Config.CHUNK_SIZE)
-            self.audio_queue.put(data)
-            
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
-        
-    async def start_recording(self, language="en", model="nova-2"):
+    async def start_recording(self, language="en", model="nova-3"):
         """Start recording and transcription with optimized settings"""
         if not self.api_key:
             raise ValueError("Deepgram API key is not configured")
             
         self.is_recording = True
-        self.transcript = ""
+        self._transcript_parts = []
+        self._interim_transcript = ""
+        done = self._done
+        self._loop = asyncio.get_running_loop()
+        self.audio_queue = asyncio.Queue(maxsize=32)
         
         try:
             # Only perform accent detection if enabled
@@ -272,10 +547,8 @@ class STTHandler:
             # Connect with optimized parameters
             await self.connect_deepgram(language=language, model=model)
             
-            # Start recording thread
-            record_thread = threading.Thread(target=self.record_audio)
-            record_thread.daemon = True
-            record_thread.start()
+            # Start the microphone; buffers arrive through the PyAudio callback
+            self.record_audio()
             
             # Start async tasks
             await asyncio.gather(
@@ -285,20 +558,84 @@ class STTHandler:
             
         except Exception as e:
             self.is_recording = False
+            self._close_microphone()
             if 'quota' in str(e).lower():
                 raise Exception("API quota exceeded. Please check your Deepgram account or disable accent detection in .env")
             raise
+        finally:
+            # Nothing more will arrive, so don't leave a waiter hanging until its timeout
+            done.set()
+    
+    async def wait_for_end_of_speech(self, timeout):
+        """Wait until Deepgram endpoints the current utterance, or `timeout` seconds pass"""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
         
     def stop_recording(self):
         """Stop recording"""
         self.is_recording = False
+        self._ws_open.clear()
+        # Fresh event for the next turn, which may run under its own asyncio.run
+        self._done = asyncio.Event()
+        self._close_microphone()
         if self.websocket:
             asyncio.create_task(self.websocket.close())
         return self.transcript
     
+    def close(self):
+        """Release pooled HTTP connections"""
+        self.session.close()
+
+    def _get_async_session(self):
+        """Shared AsyncClient; HTTP/2 multiplexes concurrent uploads over one warm connection"""
+        if self._async_session is None:
+            self._async_session = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(90.0, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+        return self._async_session
+
+    async def warm_up(self):
+        """Open the pooled TLS connection to Deepgram before the first transcription needs it"""
+        try:
+            await self._get_async_session().head(
+                "https://api.deepgram.com/v1/projects",
+                headers={"Authorization": f"Token {self.api_key}"},
+                timeout=5.0
+            )
+        except httpx.HTTPError as e:
+            logger.warning(f"Deepgram warm-up failed: {e}")
+
+    async def aclose(self):
+        """Release pooled HTTP connections, including the async client's"""
+        self.close()
+        if self._async_session is not None:
+            await self._async_session.aclose()
+            self._async_session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _audio_fingerprint(self, audio_file_path):
+        """Cheap content key for an audio file: its size plus a hash of the first 64 KB"""
+        with open(audio_file_path, "rb") as f:
+            head = f.read(65536)
+        digest = hashlib.blake2b(head, digest_size=8).hexdigest()
+        return f"{os.path.getsize(audio_file_path)}:{digest}"
+
     def detect_accent_and_language(self, audio_file_path):
         """Detect potential accent/language characteristics for better model selection"""
         try:
+            cache_key = self._audio_fingerprint(audio_file_path)
+            if cache_key in self._accent_cache:
+                return self._accent_cache[cache_key]
+            
             # Quick transcription with multiple language models to detect accent
             test_params = {
                 "model": "nova-3",
@@ -309,30 +646,34 @@ class STTHandler:
                 "alternatives": "1"
             }
             
-            # Test with a small sample (first 10 seconds) for accent detection
-            temp_sample = self.create_audio_sample(audio_file_path, duration=10)
-            if not temp_sample:
-                return "en", "general"  # Default fallback
-            
             headers = {
                 "Authorization": f"Token {self.api_key}",
                 "Content-Type": "audio/wav"
             }
             
-            with open(temp_sample, "rb") as audio_file:
-                audio_data = audio_file.read()
-            
-            response = requests.post(
-                "https://api.deepgram.com/v1/listen",
-                headers=headers,
-                params=test_params,
-                data=audio_data,
-                timeout=30
-            )
-            
-            # Clean up sample file
-            if os.path.exists(temp_sample):
-                os.remove(temp_sample)
+            # Test with a small sample (first 10 seconds) for accent detection
+            if self._is_sample_sized_wav(audio_file_path, duration=10):
+                # Already short 16 kHz mono PCM: stream the file itself instead of copying it into memory
+                with open(audio_file_path, "rb") as audio_file:
+                    response = self.session.post(
+                        DEEPGRAM_LISTEN_URL,
+                        headers=headers,
+                        params=test_params,
+                        content=audio_file,
+                        timeout=30
+                    )
+            else:
+                audio_data = self.create_audio_sample(audio_file_path, duration=10)
+                if not audio_data:
+                    return "en", "general"  # Default fallback
+                
+                response = self.session.post(
+                    DEEPGRAM_LISTEN_URL,
+                    headers=headers,
+                    params=test_params,
+                    content=audio_data,
+                    timeout=30
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -347,6 +688,9 @@ class STTHandler:
                         
                         print(f"Accent detection - Transcript: '{transcript[:50]}...', Confidence: {confidence:.3f}, Detected accent: {accent_type}")
                         
+                        if len(self._accent_cache) >= ACCENT_CACHE_SIZE:
+                            self._accent_cache.pop(next(iter(self._accent_cache)))
+                        self._accent_cache[cache_key] = ("en", accent_type)
                         return "en", accent_type
             
             return "en", "general"
@@ -362,21 +706,18 @@ class STTHandler:
         
         transcript_lower = transcript.lower()
         
-        # Pattern indicators for different accent types
-        patterns = {
-            "indian": ["actually", "basically", "definitely", "obviously", "totally", "really", "very much", "good", "nice", "excellent"],
-            "british": ["quite", "rather", "brilliant", "lovely", "proper", "indeed", "certainly", "absolutely", "whilst", "amongst"],
-            "australian": ["mate", "fair dinkum", "no worries", "good on you", "she'll be right", "reckon", "heaps", "bloody"],
-            "american": ["awesome", "cool", "dude", "totally", "like", "you know", "whatever", "basically", "literally"],
-            "canadian": ["eh", "about", "house", "out", "sorry", "aboot", "hoose", "oot"],
-            "south_african": ["ja", "now now", "just now", "shame", "lekker", "boet", "howzit"]
-        }
+        # Count each accent's distinct keywords found in the transcript
+        if _ACCENT_AUTOMATON is not None:
+            found = {keyword for _, (keyword, _accents) in _ACCENT_AUTOMATON.iter(transcript_lower)}
+        else:
+            found = {keyword for keyword in _ACCENT_KEYWORD_INDEX if keyword in transcript_lower}
         
-        accent_scores = {}
-        for accent, keywords in patterns.items():
-            score = sum(1 for keyword in keywords if keyword in transcript_lower)
-            if score > 0:
-                accent_scores[accent] = score
+        # Walk the table in its fixed order so max() breaks ties the same way on every run
+        accent_scores = {
+            accent: score
+            for accent, keywords in ACCENT_KEYWORDS.items()
+            if (score := sum(1 for keyword in keywords if keyword in found))
+        }
         
         if accent_scores:
             detected_accent = max(accent_scores, key=accent_scores.get)
@@ -385,27 +726,49 @@ class STTHandler:
         
         return "general"
     
+    def _is_sample_sized_wav(self, audio_file_path, duration=10):
+        """True if the file is 16 kHz mono PCM WAV no longer than `duration` seconds"""
+        header = _probe_wav(audio_file_path)
+        return header is not None and header[:3] == (16000, 1, 2) and header.nframes <= duration * 16000
+
     def create_audio_sample(self, audio_file_path, duration=10):
-        """Create a short audio sample for accent detection"""
+        """Create a short in-memory WAV sample for accent detection"""
+        # 16 kHz mono PCM WAV (what the upload path produces) can be trimmed without ffmpeg
+        header = _probe_wav(audio_file_path)
+        if header is not None and header[:3] == (16000, 1, 2):
+            try:
+                with wave.open(audio_file_path, "rb") as source:
+                    frames = source.readframes(duration * 16000)
+                buffer = io.BytesIO()
+                with wave.open(buffer, "wb") as sample:
+                    sample.setnchannels(1)
+                    sample.setsampwidth(2)
+                    sample.setframerate(16000)
+                    sample.writeframes(frames)
+                return buffer.getvalue()
+            except Exception as e:
+                print(f"Sample creation error: {e}")
+                return None
+        
+        if not self._ffmpeg:
+            return None
+        
         try:
-            temp_dir = tempfile.mkdtemp()
-            sample_file = os.path.join(temp_dir, "accent_sample.wav")
-            
-            # Use ffmpeg to extract first 10 seconds
+            # Use ffmpeg to extract first 10 seconds, written to stdout instead of a temp file
             ffmpeg_cmd = [
-                "ffmpeg", "-y",
+                self._ffmpeg, "-y",
                 "-i", audio_file_path,
                 "-t", str(duration),  # Duration in seconds
                 "-ar", "16000",
                 "-ac", "1",
                 "-c:a", "pcm_s16le",
                 "-f", "wav",
-                sample_file
+                "pipe:1"
             ]
             
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0 and os.path.exists(sample_file):
-                return sample_file
+            result = subprocess.run(ffmpeg_cmd, capture_output=True, timeout=30)
+            if result.returncode == 0 and result.stdout:
+                return result.stdout
             
         except Exception as e:
             print(f"Sample creation error: {e}")
@@ -424,18 +787,33 @@ class STTHandler:
                 return audio_file_path, f"Input validation failed: {validation_error}"
             
             # Check if file is already in good format - if so, skip preprocessing
-            try:
-                with wave.open(audio_file_path, 'rb') as wav_file:
-                    sample_rate = wav_file.getframerate()
-                    channels = wav_file.getnchannels()
-                    sample_width = wav_file.getsampwidth()
-                    
-                    # If already in ideal format (16kHz, mono, 16-bit), skip preprocessing
-                    if sample_rate == 16000 and channels == 1 and sample_width == 2:
-                        print(f"Audio already in optimal format, skipping preprocessing")
-                        return audio_file_path, None
-            except Exception as wav_check:
-                print(f"WAV format check failed: {wav_check}, proceeding with preprocessing")
+            header = _probe_wav(audio_file_path)
+            if header is not None:
+                # If already in ideal format (16kHz, mono, 16-bit), skip preprocessing
+                if header[:3] == (16000, 1, 2):
+                    print(f"Audio already in optimal format, skipping preprocessing")
+                    return audio_file_path, None
+                
+                # PCM16 WAV at another rate/layout: resample in-process rather than spawning ffmpeg
+                if header.width == 2:
+                    try:
+                        with wave.open(audio_file_path, 'rb') as wav_file:
+                            frames = wav_file.readframes(header.nframes)
+                        pcm = AudioProcessor.pcm16_to_mono(frames, header.channels, header.rate)
+                        # Own temp directory, since transcribe_audio_file removes the processed file's directory
+                        processed_file = os.path.join(tempfile.mkdtemp(), "processed_audio.wav")
+                        with open(processed_file, "wb") as processed:
+                            processed.write(AudioProcessor.encode_wav(pcm))
+                        print(f"Resampled {header.rate} Hz / {header.channels} ch WAV to 16kHz mono in-process")
+                        return processed_file, None
+                    except Exception as resample_error:
+                        print(f"In-process resample failed: {resample_error}, proceeding with preprocessing")
+            else:
+                print("WAV format check failed, proceeding with preprocessing")
+            
+            if not self._ffmpeg:
+                print("FFmpeg not available, using original file")
+                return audio_file_path, "FFmpeg not available, using original file"
             
             # Create temporary file for processed audio
             temp_dir = tempfile.mkdtemp()
@@ -444,7 +822,7 @@ class STTHandler:
             # Minimal processing to ensure compatibility without corruption
             # Skip complex filters that might cause issues
             ffmpeg_cmd = [
-                "ffmpeg", "-y",  # Overwrite output file
+                self._ffmpeg, "-y",  # Overwrite output file
                 "-i", audio_file_path,  # Input file
                 "-ar", "16000",  # Sample rate 16kHz
                 "-ac", "1",      # Mono channel
@@ -464,18 +842,16 @@ class STTHandler:
                     file_size = os.path.getsize(processed_file)
                     if file_size > 1024:  # At least 1KB
                         # Additional validation: check if file is valid WAV
-                        try:
-                            with wave.open(processed_file, 'rb') as test_wav:
-                                frames = test_wav.getnframes()
-                                if frames > 0:
-                                    print(f"Audio preprocessing successful: {processed_file} ({file_size} bytes)")
-                                    return processed_file, None
-                                else:
-                                    print(f"Processed audio has no frames, using original")
-                                    return audio_file_path, "Processed audio invalid, using original"
-                        except Exception as wav_test:
-                            print(f"Processed audio validation failed: {wav_test}, using original")
+                        processed_header = _probe_wav(processed_file)
+                        if processed_header is None:
+                            print(f"Processed audio validation failed, using original")
                             return audio_file_path, "Processed audio validation failed, using original"
+                        if processed_header.nframes > 0:
+                            print(f"Audio preprocessing successful: {processed_file} ({file_size} bytes)")
+                            return processed_file, None
+                        else:
+                            print(f"Processed audio has no frames, using original")
+                            return audio_file_path, "Processed audio invalid, using original"
                     else:
                         print(f"Processed file too small: {file_size} bytes")
                         return audio_file_path, "Processed file too small, using original"
@@ -513,8 +889,10 @@ class STTHandler:
                     return True
                 
                 # If not WAV, check if it's at least a valid audio file by trying to process a small sample
+                if not self._ffprobe:
+                    return False
                 try:
-                    test_cmd = ["ffprobe", "-v", "quiet", "-show_entries", "format=duration", "-of", "csv=p=0", audio_file_path]
+                    test_cmd = [self._ffprobe, "-v", "quiet", "-show_entries", "format=duration", "-of", "csv=p=0", audio_file_path]
                     result = subprocess.run(test_cmd, capture_output=True, text=True, timeout=10)
                     if result.returncode == 0 and result.stdout.strip():
                         duration = float(result.stdout.strip())
@@ -530,13 +908,16 @@ class STTHandler:
     
     def simple_preprocess_audio(self, audio_file_path):
         """Simple audio preprocessing fallback when advanced processing fails"""
+        if not self._ffmpeg:
+            return audio_file_path, "FFmpeg not available, using original"
+        
         try:
             temp_dir = tempfile.mkdtemp()
             processed_file = os.path.join(temp_dir, "simple_processed.wav")
             
             # Basic processing - just convert to standard format
             ffmpeg_cmd = [
-                "ffmpeg", "-y",
+                self._ffmpeg, "-y",
                 "-i", audio_file_path,
                 "-ar", "16000",
                 "-ac", "1",
@@ -561,11 +942,29 @@ class STTHandler:
         try:
             print(f"Validating audio file: {audio_file_path}")
             
-            # Check file exists and has content
-            if not os.path.exists(audio_file_path):
+            # Check file exists and has content (one stat call for both)
+            try:
+                stat = os.stat(audio_file_path)
+            except FileNotFoundError:
                 return False, "Audio file not found"
             
-            file_size = os.path.getsize(audio_file_path)
+            # transcribe_audio_file and preprocess_audio both validate the same file
+            cache_key = (audio_file_path, stat.st_size, stat.st_mtime_ns)
+            if cache_key in self._validation_cache:
+                return self._validation_cache[cache_key]
+            result = self._validate_audio_stat(audio_file_path, stat.st_size)
+            if len(self._validation_cache) >= ACCENT_CACHE_SIZE:
+                self._validation_cache.pop(next(iter(self._validation_cache)))
+            self._validation_cache[cache_key] = result
+            return result
+            
+        except Exception as e:
+            print(f"Audio validation error: {e}")
+            return False, f"Audio validation failed: {str(e)}"
+    
+    def _validate_audio_stat(self, audio_file_path, file_size):
+        """Size, extension and WAV duration checks for validate_audio_file"""
+        try:
             if file_size < 1024:  # Less than 1KB
                 return False, "Audio file too small - likely corrupted"
             elif file_size > 50 * 1024 * 1024:  # More than 50MB
@@ -575,28 +974,24 @@ class STTHandler:
             
             # Check file extension
             file_extension = os.path.splitext(audio_file_path)[1].lower()
-            supported_formats = ['.wav', '.mp3', '.webm', '.m4a', '.ogg', '.flac']
             
-            if file_extension not in supported_formats:
+            if file_extension not in CONTENT_TYPE_MAP:
                 return False, f"Unsupported audio format: {file_extension}"
             
             # For WAV files, do basic header validation
             if file_extension == '.wav':
-                try:
-                    with wave.open(audio_file_path, 'rb') as wav_file:
-                        frames = wav_file.getnframes()
-                        sample_rate = wav_file.getframerate()
-                        duration = frames / sample_rate if sample_rate > 0 else 0
-                        
-                        print(f"WAV file - Duration: {duration:.2f}s, Sample rate: {sample_rate}Hz")
-                        
-                        if duration < 0.5:
-                            return False, "Audio too short for transcription (< 0.5s)"
-                        elif duration > 300:
-                            return False, "Audio too long - please use clips under 5 minutes"
-                        
-                except Exception as wav_error:
-                    print(f"WAV validation warning: {wav_error}")
+                header = _probe_wav(audio_file_path)
+                if header is not None:
+                    duration = header.nframes / header.rate if header.rate > 0 else 0
+                    
+                    print(f"WAV file - Duration: {duration:.2f}s, Sample rate: {header.rate}Hz")
+                    
+                    if duration < 0.5:
+                        return False, "Audio too short for transcription (< 0.5s)"
+                    elif duration > 300:
+                        return False, "Audio too long - please use clips under 5 minutes"
+                else:
+                    print("WAV validation warning: could not parse WAV header")
                     # Continue anyway - might still work with Deepgram
             
             print("Audio file validation passed")
@@ -606,31 +1001,44 @@ class STTHandler:
             print(f"Audio validation error: {e}")
             return False, f"Audio validation failed: {str(e)}"
     
+    def _is_silent_wav(self, audio):
+        """True if `audio` (a path or WAV bytes) is PCM16 WAV in which no window's mean amplitude reaches SILENCE_THRESHOLD"""
+        try:
+            if isinstance(audio, (bytes, bytearray)):
+                if audio[:4] != b'RIFF':
+                    return False
+                source = io.BytesIO(audio)
+            else:
+                header = _probe_wav(audio)
+                if header is None or header.width != 2:
+                    return False
+                source = audio
+            with wave.open(source, "rb") as wav_file:
+                if wav_file.getsampwidth() != 2:
+                    return False
+                # Judge each window separately so pauses can't average out quiet speech,
+                # and stop reading at the first window with speech in it
+                window = max(1, int(wav_file.getframerate() * SILENCE_WINDOW_SECONDS))
+                while True:
+                    frames = wav_file.readframes(window)
+                    if not frames:
+                        return True
+                    if not AudioProcessor.detect_silence(frames, threshold=SILENCE_THRESHOLD):
+                        return False
+        except (wave.Error, EOFError, OSError):
+            return False
+
     def validate_transcript(self, transcript, confidence=None):
         """Validate transcript quality and detect potential hallucinations"""
         if not transcript or not transcript.strip():
             return False, "Empty transcript"
         
-        # Check for common hallucination patterns
-        hallucination_patterns = [
-            "thank you for watching",
-            "subscribe to my channel",
-            "like and subscribe",
-            "please subscribe",
-            "music playing",
-            "background music",
-            "applause",
-            "laughter",
-            "silence",
-            "[music]",
-            "[applause]",
-            "[laughter]"
-        ]
-        
+        # Check for common hallucination patterns, but only scan when one of their first words occurs
         transcript_lower = transcript.lower()
-        for pattern in hallucination_patterns:
-            if pattern in transcript_lower:
-                return False, f"Detected potential hallucination: '{pattern}'"
+        if not _HALLUCINATION_FIRST_WORDS.isdisjoint(_WORD_RE.findall(transcript_lower)):
+            match = _HALLUCINATION_RE.search(transcript_lower)
+            if match:
+                return False, f"Detected potential hallucination: '{match.group(0)}'"
         
         # Check transcript length vs expected speech
         words = transcript.split()
@@ -638,7 +1046,14 @@ class STTHandler:
             return False, "Transcript too short - likely noise"
         
         # Check for repetitive patterns (common in hallucinations)
-        if len(set(words)) < len(words) * 0.3:  # Less than 30% unique words
+        # Stop counting as soon as 30% of the words are known to be unique
+        min_unique = len(words) * 0.3
+        seen = set()
+        for word in words:
+            seen.add(word)
+            if len(seen) >= min_unique:
+                break
+        else:
             return False, "Transcript appears repetitive - possible hallucination"
         
         # Check confidence if available
@@ -649,7 +1064,7 @@ class STTHandler:
     
     def transcribe_audio_file(self, audio_file_path):
         """Transcribe audio file using Deepgram REST API with enhanced error handling"""
-        preprocessed_file = None
+        file_to_transcribe = audio_file_path
         try:
             # Check if API key is valid
             if not self.api_key or len(self.api_key) < 30:
@@ -668,149 +1083,238 @@ class STTHandler:
             detected_language, detected_accent = self.detect_accent_and_language(audio_file_path)
             print(f"Detected language: {detected_language}, accent: {detected_accent}")
             
-            # Try preprocessing, but use original file if it fails or causes issues
-            try:
-                file_to_transcribe, preprocessing_warning = self.preprocess_audio(audio_file_path, detected_accent)
-                if preprocessing_warning:
-                    print(f"Preprocessing warning: {preprocessing_warning}")
-                    # If preprocessing failed, use original file
-                    if "failed" in preprocessing_warning.lower() or "error" in preprocessing_warning.lower():
-                        print("Using original file due to preprocessing failure")
-                        file_to_transcribe = audio_file_path
-            except Exception as e:
-                print(f"Audio preprocessing failed: {e}")
-                print("Falling back to original audio file")
-                file_to_transcribe = audio_file_path
+            # Already 16 kHz mono linear16 WAV (what the upload path produces): nothing to convert,
+            # so don't call preprocess_audio at all (the header parse is cached by _probe_wav)
+            header = _probe_wav(audio_file_path)
+            if header is not None and header[:3] == (16000, 1, 2):
+                print("Audio already in optimal format, skipping preprocessing")
+            else:
+                # Try preprocessing, but use original file if it fails or causes issues
+                try:
+                    file_to_transcribe, preprocessing_warning = self.preprocess_audio(audio_file_path, detected_accent)
+                    if preprocessing_warning:
+                        print(f"Preprocessing warning: {preprocessing_warning}")
+                        # If preprocessing failed, use original file
+                        if "failed" in preprocessing_warning.lower() or "error" in preprocessing_warning.lower():
+                            print("Using original file due to preprocessing failure")
+                            file_to_transcribe = audio_file_path
+                except Exception as e:
+                    print(f"Audio preprocessing failed: {e}")
+                    print("Falling back to original audio file")
+                    file_to_transcribe = audio_file_path
             
-            print(f"Transcribing file: {file_to_transcribe}")
+            # Nothing to transcribe, so skip the upload and its retries
+            if self._is_silent_wav(file_to_transcribe):
+                print("Audio is silent, skipping Deepgram")
+                return "No speech detected"
             
-            # Deepgram REST API endpoint
-            url = "https://api.deepgram.com/v1/listen"
+            print(f"Transcribing file: {file_to_transcribe}")
             
             # Determine content type based on file extension
-            file_extension = os.path.splitext(audio_file_path)[1].lower()
-            content_type_map = {
-                '.wav': 'audio/wav',
-                '.mp3': 'audio/mpeg',
-                '.webm': 'audio/webm',
-                '.m4a': 'audio/mp4',
-                '.ogg': 'audio/ogg',
-                '.flac': 'audio/flac'
-            }
-            content_type = content_type_map.get(file_extension, 'audio/wav')
+            content_type = CONTENT_TYPE_MAP.get(os.path.splitext(audio_file_path)[1].lower(), 'audio/wav')
             
-            # Headers for authentication
+            # Stream the file to Deepgram instead of reading it into memory first
+            with open(file_to_transcribe, "rb") as audio_file:
+                return self._transcribe_bytes(audio_file, content_type, detected_language, detected_accent)
+                
+        except FileNotFoundError:
+            print(f"Audio file not found: {audio_file_path}")
+            return "Audio file not found"
+        except Exception as e:
+            print(f"Unexpected error during transcription: {e}")
+            return f"Transcription error: {str(e)}"
+        finally:
+            # Clean up temporary preprocessed file if it was created
+            if file_to_transcribe != audio_file_path and os.path.exists(file_to_transcribe):
+                try:
+                    temp_dir = os.path.dirname(file_to_transcribe)
+                    shutil.rmtree(temp_dir)
+                    print(f"Cleaned up temporary file: {file_to_transcribe}")
+                except Exception as cleanup_error:
+                    print(f"Warning: Could not clean up temporary file: {cleanup_error}")
+
+    async def transcribe_audio_buffer_async(self, audio_data, content_type="audio/wav", language="en", accent="general"):
+        """Transcribe in-memory audio on the shared AsyncClient, skipping file validation, accent detection and preprocessing"""
+        if not self.api_key or len(self.api_key) < 30:
+            return "Invalid Deepgram API key. Please get a valid key from https://console.deepgram.com/"
+        if self._is_silent_wav(audio_data):
+            return "No speech detected"
+        try:
+            return await self._transcribe_bytes_async(audio_data, content_type, language, accent)
+        except Exception as e:
+            print(f"Unexpected error during transcription: {e}")
+            return f"Transcription error: {str(e)}"
+
+    def _transcription_params(self, detected_language, detected_accent):
+        """Query parameters for a pre-recorded Deepgram transcription"""
+        params = {
+            **TRANSCRIPTION_PARAMS,
+            "language": detected_language,
+            "alternatives": str(Config.STT_ALTERNATIVES),
+            **ACCENT_PARAMS.get(detected_accent, DEFAULT_ACCENT_PARAMS)
+        }
+        
+        print(f"Using clean API parameters: {list(params.keys())}")
+        return params
+
+    @staticmethod
+    def _backoff_delay(attempt, base=2, cap=30):
+        """Full-jitter exponential backoff, so concurrent retries after a 429/503 don't line up"""
+        return random.uniform(0, min(cap, base * 2 ** attempt))
+
+    def _attempt_outcome(self, attempt, max_retries, response=None, error=None):
+        """Decide what follows one Deepgram attempt: ("done", None), ("retry", None) or ("fail", message)"""
+        last_attempt = attempt >= max_retries - 1
+        
+        if error is not None:
+            if isinstance(error, httpx.TimeoutException):
+                if last_attempt:
+                    return "fail", "Request timeout after multiple attempts. Audio processing took too long - try a shorter audio clip."
+                print(f"Request timeout on attempt {attempt + 1}, retrying...")
+            elif isinstance(error, httpx.NetworkError):
+                if last_attempt:
+                    return "fail", "Network connection error after multiple attempts. Please check your internet connection."
+                print(f"Connection error on attempt {attempt + 1}, retrying...")
+            else:
+                print(f"Request error on attempt {attempt + 1}: {error}")
+                if last_attempt:
+                    return "fail", f"Network error during transcription after multiple attempts: {str(error)}"
+            return "retry", None
+        
+        # If successful, stop retrying
+        if response.status_code == 200:
+            print("Request successful!")
+            return "done", None
+        
+        # For retryable errors (503, 429, 502, 504), wait and try again
+        if response.status_code in [503, 429, 502, 504]:
+            if last_attempt:
+                print(f"All {max_retries} attempts failed with retryable errors")
+                return "done", None
+            try:
+                error_msg = response.json().get('err_msg', 'Unknown error')
+            except Exception:
+                error_msg = response.text[:100] if response.text else "No error message"
+            print(f"Attempt {attempt + 1} failed with status {response.status_code}: {error_msg}")
+            return "retry", None
+        
+        # Non-retryable error, stop immediately
+        print(f"Non-retryable error {response.status_code}, stopping retries")
+        return "done", None
+
+    def _transcribe_bytes(self, audio_data, content_type, detected_language, detected_accent):
+        """Send audio bytes (or an open audio file) to the Deepgram REST API and pick the best alternative"""
+        try:
             headers = {
                 "Authorization": f"Token {self.api_key}",
                 "Content-Type": content_type
             }
+            params = self._transcription_params(detected_language, detected_accent)
+            # audio_data is either bytes or an open binary file that httpx streams from disk
+            is_file = hasattr(audio_data, "seek")
+            size = os.fstat(audio_data.fileno()).st_size if is_file else len(audio_data)
+            print(f"Audio file size: {size} bytes")
             
-            # Clean parameters for Nova-3 model (no deprecated parameters)
-            params = {
-                "model": "nova-3",
-                "language": detected_language,
-                "smart_format": "true",
-                "punctuate": "true",
-                "confidence": "true",
-                "alternatives": "3",
-                "filler_words": "true",
-                "numerals": "true",
-                "interim_results": "false",
-                "encoding": "linear16",
-                "sample_rate": "16000",
-                "channels": "1"
-            }
-            
-            # Add accent-specific endpointing (only non-deprecated parameter)
-            if detected_accent == "indian":
-                params["endpointing"] = "400"
-                params["tier"] = "enhanced"
-            elif detected_accent == "british":
-                params["endpointing"] = "250"
-            elif detected_accent == "australian":
-                params["endpointing"] = "350"
-            elif detected_accent == "south_african":
-                params["endpointing"] = "450"
-            else:
-                params["endpointing"] = "300"
-            
-            print(f"Using clean API parameters: {list(params.keys())}")
+            # Make request to Deepgram API with retry logic
+            print("Making request to Deepgram API...")
+            max_retries = 5
+            response = None
             
-            # Read audio file
-            with open(file_to_transcribe, "rb") as audio_file:
-                audio_data = audio_file.read()
+            for attempt in range(max_retries):
+                print(f"Attempt {attempt + 1}/{max_retries}...")
+                error = None
+                if is_file:
+                    audio_data.seek(0)  # Rewind for retries
+                try:
+                    response = self.session.post(
+                        DEEPGRAM_LISTEN_URL,
+                        headers=headers,
+                        params=params,
+                        content=audio_data,
+                        timeout=90
+                    )
+                except httpx.HTTPError as e:
+                    error = e
+                
+                action, failure = self._attempt_outcome(attempt, max_retries, response, error)
+                if action == "fail":
+                    return failure
+                if action == "done":
+                    break
+                delay = self._backoff_delay(attempt)
+                print(f"Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
             
+            return self._parse_transcription_response(response)
+        except httpx.TimeoutException:
+            print("Request timeout")
+            return "Request timeout. Audio processing took too long - try a shorter audio clip."
+        except httpx.NetworkError:
+            print("Connection error")
+            return "Network connection error. Please check your internet connection."
+        except httpx.HTTPError as e:
+            print(f"Request error: {e}")
+            return f"Network error during transcription: {str(e)}"
+
+    async def _transcribe_bytes_async(self, audio_data, content_type, detected_language, detected_accent):
+        """Async variant of _transcribe_bytes on the shared HTTP/2 AsyncClient"""
+        try:
+            headers = {
+                "Authorization": f"Token {self.api_key}",
+                "Content-Type": content_type
+            }
+            params = self._transcription_params(detected_language, detected_accent)
             print(f"Audio file size: {len(audio_data)} bytes")
             
-            # Make request to Deepgram API with retry logic
-            print("Making request to Deepgram API...")
             max_retries = 5
-            retry_delay = 2  # seconds
             response = None
             
             for attempt in range(max_retries):
+                print(f"Attempt {attempt + 1}/{max_retries}...")
+                error = None
                 try:
-                    print(f"Attempt {attempt + 1}/{max_retries}...")
-                    response = requests.post(
-                        url,
+                    response = await self._get_async_session().post(
+                        DEEPGRAM_LISTEN_URL,
                         headers=headers,
                         params=params,
-                        data=audio_data,
-                        timeout=90
+                        content=audio_data
                     )
-                    
-                    # If successful, break the loop
-                    if response.status_code == 200:
-                        print("Request successful!")
-                        break
-                        
-                    # For retryable errors (503, 429, 502, 504), wait and try again
-                    if response.status_code in [503, 429, 502, 504]:
-                        if attempt < max_retries - 1:
-                            error_msg = "Unknown error"
-                            try:
-                                error_data = response.json()
-                                error_msg = error_data.get('err_msg', 'Unknown error')
-                            except:
-                                error_msg = response.text[:100] if response.text else "No error message"
-                            
-                            print(f"Attempt {attempt + 1} failed with status {response.status_code}: {error_msg}")
-                            print(f"Retrying in {retry_delay} seconds...")
-                            import time
-                            time.sleep(retry_delay)
-                            retry_delay = min(retry_delay * 2, 30)  # Exponential backoff, max 30s
-                        else:
-                            print(f"All {max_retries} attempts failed with retryable errors")
-                    else:
-                        # Non-retryable error, break immediately
-                        print(f"Non-retryable error {response.status_code}, stopping retries")
-                        break
-                        
-                except requests.exceptions.Timeout:
-                    if attempt < max_retries - 1:
-                        print(f"Request timeout on attempt {attempt + 1}, retrying in {retry_delay} seconds...")
-                        import time
-                        time.sleep(retry_delay)
-                        retry_delay = min(retry_delay * 2, 30)
-                    else:
-                        return "Request timeout after multiple attempts. Audio processing took too long - try a shorter audio clip."
-                except requests.exceptions.ConnectionError:
-                    if attempt < max_retries - 1:
-                        print(f"Connection error on attempt {attempt + 1}, retrying in {retry_delay} seconds...")
-                        import time
-                        time.sleep(retry_delay)
-                        retry_delay = min(retry_delay * 2, 30)
-                    else:
-                        return "Network connection error after multiple attempts. Please check your internet connection."
-                except requests.exceptions.RequestException as e:
-                    print(f"Request error on attempt {attempt + 1}: {e}")
-                    if attempt < max_retries - 1:
-                        import time
-                        time.sleep(retry_delay)
-                        retry_delay = min(retry_delay * 2, 30)
-                    else:
-                        return f"Network error during transcription after multiple attempts: {str(e)}"
+                except httpx.HTTPError as e:
+                    error = e
+                
+                action, failure = self._attempt_outcome(attempt, max_retries, response, error)
+                if action == "fail":
+                    return failure
+                if action == "done":
+                    break
+                delay = self._backoff_delay(attempt)
+                print(f"Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
             
+            return self._parse_transcription_response(response)
+        except httpx.TimeoutException:
+            print("Request timeout")
+            return "Request timeout. Audio processing took too long - try a shorter audio clip."
+        except httpx.NetworkError:
+            print("Connection error")
+            return "Network connection error. Please check your internet connection."
+        except httpx.HTTPError as e:
+            print(f"Request error: {e}")
+            return f"Network error during transcription: {str(e)}"
+
+    def _record_alternative_pick(self, index):
+        """Log how often the scorer overrides Deepgram's top alternative, to judge if STT_ALTERNATIVES can be 1"""
+        self._alternative_picks += 1
+        if index != 0:
+            self._alternative_overrides += 1
+        logger.info(
+            f"Scorer overrode the top alternative in {self._alternative_overrides}/{self._alternative_picks} "
+            f"transcriptions ({self._alternative_overrides / self._alternative_picks:.1%})"
+        )
+
+    def _parse_transcription_response(self, response):
+        """Turn a Deepgram pre-recorded response into a transcript or an error message"""
+        try:
             # Check if we have a response
             if response is None:
                 return "Failed to get response from Deepgram API after multiple attempts"
@@ -831,51 +1335,35 @@ class STTHandler:
                         if alternatives and len(alternatives) > 0:
                             print(f"Processing {len(alternatives)} alternatives for best accuracy")
                             
-                            best_transcript = None
-                            best_confidence = 0.0
-                            best_alt = None
-                            
-                            # Evaluate all alternatives to find the best one
+                            # Score every alternative in one pass, remembering each validation so the
+                            # winner isn't validated a second time
+                            best = None
                             for i, alt in enumerate(alternatives):
-                                if "transcript" in alt and alt["transcript"].strip():
-                                    transcript = alt["transcript"]
-                                    confidence = alt.get("confidence", 0.0)
-                                    
-                                    print(f"Alternative {i+1}: '{transcript[:30]}...' (confidence: {confidence:.3f})")
-                                    
-                                    # Validate transcript quality
-                                    is_valid, validation_msg = self.validate_transcript(transcript, confidence)
-                                    
-                                    # Score alternatives based on confidence and validation
-                                    score = confidence
-                                    if is_valid:
-                                        score += 0.2  # Bonus for passing validation
-                                    
-                                    # Prefer longer transcripts (more content)
-                                    word_count = len(transcript.split())
-                                    if word_count > 3:
-                                        score += 0.1
-                                    
-                                    # Prefer transcripts with interview-related keywords
-                                    interview_keywords = ['experience', 'skills', 'position', 'job', 'work', 'company', 'role', 'responsibility', 'qualification', 'background', 'education', 'training', 'project', 'team', 'leadership', 'management', 'communication', 'problem', 'solution', 'achievement', 'challenge', 'goal', 'strength', 'weakness', 'motivation', 'career', 'development']
-                                    keyword_matches = sum(1 for keyword in interview_keywords if keyword.lower() in transcript.lower())
-                                    if keyword_matches > 0:
-                                        score += min(keyword_matches * 0.05, 0.2)  # Up to 0.2 bonus
-                                    
-                                    print(f"Alternative {i+1} score: {score:.3f}")
-                                    
-                                    if score > best_confidence:
-                                        best_confidence = score
-                                        best_transcript = transcript
-                                        best_alt = alt
+                                transcript = alt.get("transcript", "")
+                                if not transcript.strip():
+                                    continue
+                                confidence = alt.get("confidence", 0.0)
+                                validation = self.validate_transcript(transcript, confidence)
+                                
+                                # Confidence, +0.2 for passing validation, +0.1 for more than 3 words,
+                                # and up to +0.2 for interview-related keywords
+                                keyword_matches = len(INTERVIEW_KEYWORDS.intersection(_WORD_RE.findall(transcript.lower())))
+                                score = (
+                                    confidence
+                                    + (0.2 if validation[0] else 0.0)
+                                    + (0.1 if len(transcript.split()) > 3 else 0.0)
+                                    + min(keyword_matches * 0.05, 0.2)
+                                )
+                                print(f"Alternative {i+1}: '{transcript[:30]}...' (confidence: {confidence:.3f}, score: {score:.3f})")
+                                
+                                if best is None or score > best[0]:
+                                    best = (score, i, transcript, confidence, validation)
                             
-                            if best_transcript:
-                                actual_confidence = best_alt.get("confidence", 0.0)
+                            if best is not None:
+                                best_confidence, best_index, best_transcript, actual_confidence, (is_valid, validation_msg) = best
+                                self._record_alternative_pick(best_index)
                                 print(f"Selected best transcript: '{best_transcript[:50]}...' (confidence: {actual_confidence:.3f}, score: {best_confidence:.3f})")
                                 
-                                # Final validation of selected transcript
-                                is_valid, validation_msg = self.validate_transcript(best_transcript, actual_confidence)
-                                
                                 if is_valid:
                                     print(f"Valid transcript selected: {best_transcript[:100]}...")
                                     return best_transcript.strip()
@@ -907,32 +1395,6 @@ class STTHandler:
                     return "Rate limit exceeded. Please wait and try again."
                 else:
                     return f"Deepgram API error {response.status_code}: {error_text[:200]}"
-                
-        except requests.exceptions.Timeout:
-            print("Request timeout")
-            return "Request timeout. Audio processing took too long - try a shorter audio clip."
-        except requests.exceptions.ConnectionError:
-            print("Connection error")
-            return "Network connection error. Please check your internet connection."
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            return f"Network error during transcription: {str(e)}"
-        except FileNotFoundError:
-            print(f"Audio file not found: {audio_file_path}")
-            return "Audio file not found"
         except json.JSONDecodeError as e:
             print(f"JSON decode error: {e}")
             return "Invalid response from Deepgram API"
-        except Exception as e:
-            print(f"Unexpected error during transcription: {e}")
-            return f"Transcription error: {str(e)}"
-        finally:
-            # Clean up temporary preprocessed file if it was created
-            if file_to_transcribe != audio_file_path and os.path.exists(file_to_transcribe):
-                try:
-                    temp_dir = os.path.dirname(file_to_transcribe)
-                    shutil.rmtree(temp_dir)
-                    print(f"Cleaned up temporary file: {file_to_transcribe}")
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not clean up temporary file: {cleanup_error}")
-   
\ No newline at end of file
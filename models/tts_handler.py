@@ -1,25 +1,117 @@
 from elevenlabs.client import ElevenLabs
 from config import Config
+from collections import OrderedDict
+import asyncio
+import hashlib
 import io
+import secrets
+import threading
 import tempfile
 import os
 
+TTS_MODEL_ID = "eleven_monolingual_v1"
+TTS_MEMORY_CACHE_SIZE = 256
+
 class TTSHandler:
     def __init__(self):
         self.client = ElevenLabs(api_key=Config.ELEVENLABS_API_KEY)
+        # Synthesized mp3 per normalized text: recent entries in memory, everything on disk
+        self._memory_cache = OrderedDict()
+        # text_to_speech runs in worker threads (text_to_speech_async), so LRU updates are serialized
+        self._memory_lock = threading.Lock()
+        self.cache_dir = Config.TTS_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def warm_up(self):
+        """Make a cheap authenticated call so the ElevenLabs client's connection is already open"""
+        try:
+            self.client.voices.get_all()
+        except Exception as e:
+            print(f"ElevenLabs warm-up failed: {e}")
+
+    def _cache_key(self, text):
+        normalized = " ".join(text.split()).casefold()
+        return hashlib.sha256(f"{Config.ELEVENLABS_VOICE_ID}:{TTS_MODEL_ID}:{normalized}".encode("utf-8")).hexdigest()
+
+    def _recall(self, key):
+        with self._memory_lock:
+            audio = self._memory_cache.get(key)
+            if audio is not None:
+                self._memory_cache.move_to_end(key)
+            return audio
+
+    def _remember(self, key, audio):
+        with self._memory_lock:
+            self._memory_cache[key] = audio
+            self._memory_cache.move_to_end(key)
+            if len(self._memory_cache) > TTS_MEMORY_CACHE_SIZE:
+                self._memory_cache.popitem(last=False)
         
     def text_to_speech(self, text):
         """Convert text to speech and return audio data (mp3 bytes)"""
+        key = self._cache_key(text)
+        audio = self._recall(key)
+        if audio is not None:
+            return audio
+        
+        cache_path = os.path.join(self.cache_dir, f"{key}.mp3")
+        try:
+            with open(cache_path, "rb") as f:
+                audio = f.read()
+            self._remember(key, audio)
+            return audio
+        except FileNotFoundError:
+            pass
+        
         audio = self.client.text_to_speech.convert(
             text=text,
             voice_id=Config.ELEVENLABS_VOICE_ID,
-            model_id="eleven_monolingual_v1",
+            model_id=TTS_MODEL_ID,
             output_format="mp3_44100_128"
         )
-        # If audio is a generator (stream), join all chunks
+        # If audio is a generator (stream), collect the chunks in one growing buffer
         if hasattr(audio, '__iter__') and not isinstance(audio, (bytes, bytearray)):
-            audio = b"".join(chunk for chunk in audio if isinstance(chunk, (bytes, bytearray)))
+            buffer = bytearray()
+            for chunk in audio:
+                if isinstance(chunk, (bytes, bytearray)):
+                    buffer += chunk
+            audio = bytes(buffer)
+        
+        # Write through to disk atomically so a partial file is never read back; the random
+        # suffix keeps concurrent syntheses of the same text from sharing a partial file
+        partial_path = f"{cache_path}.{secrets.token_hex(3)}.part"
+        try:
+            with open(partial_path, "wb") as f:
+                f.write(audio)
+            os.replace(partial_path, cache_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        self._remember(key, audio)
         return audio
+
+    async def text_to_speech_async(self, text):
+        """Run text_to_speech off the event loop so synthesis can overlap other work"""
+        return await asyncio.to_thread(self.text_to_speech, text)
+
+    def text_to_speech_stream(self, text):
+        """Yield mp3 chunks from the ElevenLabs streaming endpoint as they are synthesized"""
+        audio_stream = self.client.text_to_speech.stream(
+            text=text,
+            voice_id=Config.ELEVENLABS_VOICE_ID,
+            model_id=TTS_MODEL_ID,
+            output_format="mp3_44100_128"
+        )
+        for chunk in audio_stream:
+            if isinstance(chunk, (bytes, bytearray)):
+                yield chunk
+
+    def stream_to_file(self, text, filename):
+        """Write streamed speech for text straight to filename without buffering it all in memory"""
+        with open(filename, "wb") as f:
+            for chunk in self.text_to_speech_stream(text):
+                f.write(chunk)
+        return filename
     
     def save_audio_file(self, audio_data, filename=None):
         """Save audio data to file and return the file path"""
@@ -35,6 +127,6 @@ class TTSHandler:
         return filename
     
     def play_audio(self, audio_data):
-        """Save audio data to temporary file (playback handled by frontend)"""
-        # For web applications, we just save the file and let the frontend handle playback
-        return self.save_audio_file(audio_data)
\ No newline at end of file
+        """Return the mp3 bytes for the frontend to play (save_audio_file writes them out when needed)"""
+        # For web applications the frontend handles playback, so there is no need to round-trip through a temp file
+        return audio_data
\ No newline at end of file
@@ -31,12 +31,24 @@ def main():
     print("⏹️  Press Ctrl+C to stop the server")
     print("-" * 50)
     
+    # Interview state lives in the server process, so more than one worker needs sticky sessions
+    dev_mode = bool(os.getenv("DEV"))
+    workers = 1 if dev_mode else int(os.getenv("WEB_CONCURRENCY", "1"))
+    if dev_mode:
+        print("🔁 DEV set: auto-reload enabled")
+    elif workers > 1:
+        print(f"👷 Starting {workers} workers")
+    
     try:
         uvicorn.run(
             "main:app",
             host="0.0.0.0",
             port=8000,
-            reload=True,
+            reload=dev_mode,
+            workers=workers,
+            # uvloop and httptools ship with uvicorn[standard]; uvloop has no Windows build
+            loop="asyncio" if sys.platform == "win32" else "uvloop",
+            http="httptools",
             log_level="info"
         )
     except KeyboardInterrupt:
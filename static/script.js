@@ -11,6 +11,14 @@ let interviewData = {
 let mediaRecorder = null;
 let audioChunks = [];
 let isRecording = false;
+let recordingStream = null;
+
+// Live transcription state (PCM streamed to /ws/stt)
+const STT_SAMPLE_RATE = 16000;
+let sttSocket = null;
+let audioContext = null;
+let audioProcessor = null;
+let liveTranscript = '';
 
 // DOM elements
 const setupStage = document.getElementById('setup-stage');
@@ -207,6 +215,129 @@ async function askQuestion() {
     }
 }
 
+function downsampleToPcm16(input, inputRate) {
+    // Pick the nearest input sample for each 16 kHz output sample and convert to int16
+    const ratio = inputRate / STT_SAMPLE_RATE;
+    const length = Math.floor(input.length / ratio);
+    const output = new Int16Array(length);
+    for (let i = 0; i < length; i++) {
+        const sample = Math.max(-1, Math.min(1, input[Math.floor(i * ratio)]));
+        output[i] = sample < 0 ? sample * 0x8000 : sample * 0x7FFF;
+    }
+    return output.buffer;
+}
+
+function openSttSocket() {
+    return new Promise((resolve, reject) => {
+        const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${protocol}://${window.location.host}/ws/stt`);
+        socket.binaryType = 'arraybuffer';
+        let ready = false;
+        
+        socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            
+            if (message.type === 'ready') {
+                ready = true;
+                resolve(socket);
+            } else if (message.type === 'transcript') {
+                liveTranscript = message.full_transcript;
+                // Show interim words after the committed text while the candidate is still speaking
+                document.getElementById('response-transcript').value = message.is_final
+                    ? liveTranscript
+                    : `${liveTranscript} ${message.transcript}`.trim();
+            } else if (message.type === 'utterance_end') {
+                liveTranscript = message.full_transcript;
+                // The candidate has finished speaking: commit the answer as if Stop was pressed
+                if (isRecording && sttSocket === socket && liveTranscript.trim()) {
+                    recordResponse();
+                }
+            } else if (message.type === 'final') {
+                liveTranscript = message.transcript;
+                socket.close();
+            } else if (message.type === 'error') {
+                console.error('Live transcription error:', message.error);
+                if (!ready) {
+                    reject(new Error(message.error));
+                }
+            }
+        };
+        
+        socket.onerror = () => {
+            if (!ready) {
+                reject(new Error('Live transcription unavailable'));
+            }
+        };
+        
+        socket.onclose = () => {
+            if (!ready) {
+                reject(new Error('Live transcription connection closed'));
+            }
+        };
+    });
+}
+
+async function startLiveTranscription(stream) {
+    sttSocket = await openSttSocket();
+    liveTranscript = '';
+    
+    audioContext = new AudioContext();
+    const source = audioContext.createMediaStreamSource(stream);
+    audioProcessor = audioContext.createScriptProcessor(4096, 1, 1);
+    
+    audioProcessor.onaudioprocess = (event) => {
+        if (sttSocket && sttSocket.readyState === WebSocket.OPEN) {
+            sttSocket.send(downsampleToPcm16(event.inputBuffer.getChannelData(0), audioContext.sampleRate));
+        }
+    };
+    
+    source.connect(audioProcessor);
+    audioProcessor.connect(audioContext.destination);
+}
+
+function stopLiveTranscription() {
+    return new Promise((resolve) => {
+        const socket = sttSocket;
+        sttSocket = null;
+        
+        audioProcessor.disconnect();
+        audioProcessor = null;
+        audioContext.close();
+        audioContext = null;
+        
+        // The server answers CloseStream with the final transcript and then closes
+        socket.addEventListener('close', () => resolve(liveTranscript));
+        if (socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify({ type: 'CloseStream' }));
+        } else {
+            resolve(liveTranscript);
+        }
+    });
+}
+
+function startUploadRecording(stream) {
+    audioChunks = [];
+    mediaRecorder = new MediaRecorder(stream, {
+        mimeType: 'audio/webm;codecs=opus'
+    });
+    
+    mediaRecorder.ondataavailable = (event) => {
+        if (event.data.size > 0) {
+            audioChunks.push(event.data);
+        }
+    };
+    
+    mediaRecorder.onstop = async () => {
+        const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
+        await uploadAudioForTranscription(audioBlob);
+        
+        // Stop all tracks to release microphone
+        stream.getTracks().forEach(track => track.stop());
+    };
+    
+    mediaRecorder.start();
+}
+
 async function recordResponse() {
     const recordBtn = document.getElementById('record-response');
     
@@ -220,27 +351,18 @@ async function recordResponse() {
                     autoGainControl: true
                 } 
             });
+            recordingStream = stream;
             
-            audioChunks = [];
-            mediaRecorder = new MediaRecorder(stream, {
-                mimeType: 'audio/webm;codecs=opus'
-            });
-            
-            mediaRecorder.ondataavailable = (event) => {
-                if (event.data.size > 0) {
-                    audioChunks.push(event.data);
-                }
-            };
-            
-            mediaRecorder.onstop = async () => {
-                const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
-                await uploadAudioForTranscription(audioBlob);
-                
-                // Stop all tracks to release microphone
-                stream.getTracks().forEach(track => track.stop());
-            };
+            try {
+                // Prefer streaming so the transcript is ready as soon as the candidate stops
+                await startLiveTranscription(stream);
+                console.log('Live transcription started...');
+            } catch (streamError) {
+                console.warn('Falling back to upload transcription:', streamError);
+                sttSocket = null;
+                startUploadRecording(stream);
+            }
             
-            mediaRecorder.start();
             isRecording = true;
             
             // Update button appearance
@@ -256,7 +378,32 @@ async function recordResponse() {
         }
     } else {
         // Stop recording
-        if (mediaRecorder && mediaRecorder.state === 'recording') {
+        if (sttSocket) {
+            showLoading('Finalizing transcript...');
+            isRecording = false;
+            
+            // Reset button appearance
+            recordBtn.innerHTML = '<i class="fas fa-microphone"></i> Record Response';
+            recordBtn.classList.remove('btn-danger');
+            recordBtn.classList.add('btn-success');
+            
+            try {
+                const transcript = await stopLiveTranscription();
+                recordingStream.getTracks().forEach(track => track.stop());
+                
+                if (transcript.trim()) {
+                    document.getElementById('response-transcript').value = transcript;
+                    await submitTranscript(transcript);
+                } else {
+                    alert('No speech detected. You can type your response here manually.');
+                    document.getElementById('response-transcript').readOnly = false;
+                }
+            } catch (error) {
+                console.error('Failed to finish live transcription:', error);
+            } finally {
+                hideLoading();
+            }
+        } else if (mediaRecorder && mediaRecorder.state === 'recording') {
             showLoading('Processing audio...');
             mediaRecorder.stop();
             isRecording = false;
@@ -269,6 +416,19 @@ async function recordResponse() {
     }
 }
 
+async function submitTranscript(transcript) {
+    await apiCall('submit-response', 'POST', {
+        question_id: interviewData.currentQuestion,
+        response_text: transcript
+    });
+    
+    interviewData.responses.push({
+        question_id: interviewData.currentQuestion,
+        response: transcript,
+        timestamp: new Date().toISOString()
+    });
+}
+
 async function uploadAudioForTranscription(audioBlob) {
     try {
         const formData = new FormData();
@@ -286,16 +446,7 @@ async function uploadAudioForTranscription(audioBlob) {
             document.getElementById('response-transcript').value = transcript;
             
             // Submit response
-            await apiCall('submit-response', 'POST', {
-                question_id: interviewData.currentQuestion,
-                response_text: transcript
-            });
-            
-            interviewData.responses.push({
-                question_id: interviewData.currentQuestion,
-                response: transcript,
-                timestamp: new Date().toISOString()
-            });
+            await submitTranscript(transcript);
             
             console.log('Audio transcribed successfully:', transcript);
         } else {
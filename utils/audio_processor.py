@@ -1,20 +1,103 @@
+import io
+import wave
+import av
 import numpy as np
+import webrtcvad
 from scipy import signal
 import pyaudio
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _abs_sum_i16(samples):
+        """Sum of |sample| in one fused, auto-vectorized loop"""
+        total = 0
+        for i in range(samples.size):
+            total += abs(np.int64(samples[i]))
+        return total
+else:
+    def _abs_sum_i16(samples):
+        """Sum of |sample|; int32 keeps abs(-32768) exact"""
+        return int(np.abs(samples, dtype=np.int32).sum(dtype=np.int64))
+
+# Low-pass used by apply_noise_reduction; constant, so designed once at import
+_BUTTER_SOS = signal.butter(4, 0.1, output='sos')
+
 class AudioProcessor:
     @staticmethod
     def detect_silence(audio_data, threshold=500, chunk_size=1024):
         """Detect if audio contains silence"""
         audio_array = np.frombuffer(audio_data, dtype=np.int16)
-        return np.abs(audio_array).mean() < threshold
+        # Integer sum of |x| compared against threshold * n, so no float mean is needed
+        return _abs_sum_i16(audio_array) < threshold * audio_array.size
     
     @staticmethod
     def apply_noise_reduction(audio_data):
         """Apply basic noise reduction"""
         audio_array = np.frombuffer(audio_data, dtype=np.int16)
-        # Simple low-pass filter
-        b, a = signal.butter(4, 0.1)
-        filtered = signal.filtfilt(b, a, audio_array)
-        return filtered.astype(np.int16).tobytes()
+        # Simple low-pass filter, single causal pass in second-order sections
+        filtered = signal.sosfilt(_BUTTER_SOS, audio_array)
+        return np.clip(filtered, -32768, 32767).astype(np.int16, copy=False).tobytes()
+
+    @staticmethod
+    def decode_to_pcm16(audio_bytes, sample_rate=16000):
+        """Decode any container/codec libav understands to mono 16-bit PCM samples"""
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+        chunks = []
+        with av.open(io.BytesIO(audio_bytes)) as container:
+            for frame in container.decode(audio=0):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            # Flush samples still buffered inside the resampler
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        if not chunks:
+            raise ValueError("No audio frames found in upload")
+        return np.concatenate(chunks).astype(np.int16, copy=False)
+
+    @staticmethod
+    def pcm16_to_mono(frames, channels, src_rate, sample_rate=16000):
+        """Downmix interleaved 16-bit PCM to mono and resample it to `sample_rate`"""
+        pcm = np.frombuffer(frames, dtype=np.int16)
+        if channels > 1:
+            pcm = pcm.reshape(-1, channels).mean(axis=1)
+        if src_rate != sample_rate:
+            divisor = np.gcd(src_rate, sample_rate)
+            pcm = signal.resample_poly(pcm, sample_rate // divisor, src_rate // divisor)
+        return np.clip(pcm, -32768, 32767).astype(np.int16)
+
+    @staticmethod
+    def encode_wav(pcm, sample_rate=16000):
+        """Wrap mono 16-bit PCM samples in an in-memory WAV container"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm.tobytes())
+        return buffer.getvalue()
+
+    @staticmethod
+    def trim_silence(pcm, sample_rate=16000, aggressiveness=2, frame_ms=30, padding_ms=300):
+        """Drop leading and trailing non-speech using WebRTC VAD, keeping a little padding"""
+        vad = webrtcvad.Vad(aggressiveness)
+        frame_len = sample_rate * frame_ms // 1000
+        n_frames = len(pcm) // frame_len
+
+        def is_speech(i):
+            return vad.is_speech(pcm[i * frame_len:(i + 1) * frame_len].tobytes(), sample_rate)
+
+        # Scan inwards from both ends so only the silent edges are classified
+        first = next((i for i in range(n_frames) if is_speech(i)), None)
+        if first is None:
+            return pcm
+        last = next(i for i in range(n_frames - 1, first - 1, -1) if is_speech(i))
 
+        padding = sample_rate * padding_ms // 1000
+        start = max(first * frame_len - padding, 0)
+        end = min((last + 1) * frame_len + padding, len(pcm))
+        return pcm[start:end]
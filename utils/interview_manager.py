@@ -1,14 +1,15 @@
 from models.llm_handler import LLMHandler
 from models.tts_handler import TTSHandler
 from models.stt_handler import STTHandler
+from config import Config
 import asyncio
-import time
 
 class InterviewManager:
-    def __init__(self):
+    def __init__(self, tts=None, stt=None):
+        # Handlers can be shared so their API clients and connection pools outlive one interview
         self.llm = LLMHandler()
-        self.tts = TTSHandler()
-        self.stt = STTHandler()
+        self.tts = tts or TTSHandler()
+        self.stt = stt or STTHandler()
         self.interview_data = {
             "job_description": "",
             "questions": [],
@@ -16,28 +17,45 @@ class InterviewManager:
             "analyses": []
         }
         
-    def setup_interview(self, job_description):
+    def setup_interview(self, job_description, num_questions=5):
         """Setup interview with job description"""
         self.interview_data["job_description"] = job_description
-        questions_data = self.llm.generate_interview_questions(job_description)
+        questions_data = self.llm.generate_interview_questions(job_description, num_questions)
         self.interview_data["questions"] = questions_data["questions"]
         return self.interview_data["questions"]
+
+    async def setup_interview_async(self, job_description, num_questions=5):
+        """Setup interview with job description without blocking the event loop"""
+        self.interview_data["job_description"] = job_description
+        # Warm the TTS/STT connections while Gemini writes the questions
+        questions_data, _ = await asyncio.gather(
+            self.llm.generate_interview_questions_async(job_description, num_questions),
+            self.warm_up()
+        )
+        self.interview_data["questions"] = questions_data["questions"]
+        return self.interview_data["questions"]
+
+    async def warm_up(self):
+        """Establish the ElevenLabs and Deepgram connections before the first question is asked"""
+        await asyncio.gather(
+            asyncio.to_thread(self.tts.warm_up),
+            self.stt.warm_up()
+        )
     
     def ask_question(self, question_text):
         """Ask question using TTS"""
         audio_data = self.tts.text_to_speech(question_text)
-        self.tts.play_audio(audio_data)
+        return self.tts.play_audio(audio_data)
         
     async def get_candidate_response(self, timeout=30):
         """Get candidate's response using STT"""
-        await self.stt.start_recording()
+        recording = asyncio.create_task(self.stt.start_recording())
         
-        # Wait for response or timeout
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            await asyncio.sleep(0.1)
+        # Return as soon as the candidate stops speaking instead of always waiting out the timeout
+        await self.stt.wait_for_end_of_speech(timeout)
             
         transcript = self.stt.stop_recording()
+        await recording
         return transcript
     
     def analyze_response(self, question, answer):
@@ -48,36 +66,90 @@ class InterviewManager:
             self.interview_data["job_description"]
         )
         return analysis
+
+    async def analyze_response_async(self, question, answer):
+        """Analyze candidate's response without blocking the event loop"""
+        return await self.llm.analyze_answer_async(
+            question,
+            answer,
+            self.interview_data["job_description"]
+        )
+
+    async def analyze_all_responses_async(self):
+        """Analyze every submitted response concurrently, replacing earlier analyses"""
+        questions = self.interview_data["questions"]
+        semaphore = asyncio.Semaphore(Config.GEMINI_MAX_CONCURRENCY)
+
+        async def analyze(response):
+            async with semaphore:
+                question = questions[response["question_id"]]["question"]
+                return await self.analyze_response_async(question, response["response"])
+
+        analyses = await asyncio.gather(
+            *[analyze(response) for response in self.interview_data["responses"]]
+        )
+        self.interview_data["analyses"] = list(analyses)
+        return self.interview_data["analyses"]
     
     def conduct_interview(self):
         """Conduct full interview"""
-        for i, question_data in enumerate(self.interview_data["questions"]):
+        asyncio.run(self.conduct_interview_async())
+
+    async def conduct_interview_async(self):
+        """Conduct full interview, synthesizing each next question while the candidate answers"""
+        questions = self.interview_data["questions"]
+        if not questions:
+            return
+        next_audio = asyncio.create_task(
+            self.tts.text_to_speech_async(f"Question 1: {questions[0]['question']}")
+        )
+        for i, question_data in enumerate(questions):
             question_text = question_data["question"]
             
-            # Ask question
-            self.ask_question(f"Question {i+1}: {question_text}")
+            # Ask question, synthesized while the previous answer was being recorded
+            self.tts.play_audio(await next_audio)
+            if i + 1 < len(questions):
+                next_audio = asyncio.create_task(
+                    self.tts.text_to_speech_async(f"Question {i+2}: {questions[i + 1]['question']}")
+                )
             
             # Get response
-            response = asyncio.run(self.get_candidate_response())
+            response = await self.get_candidate_response()
             self.interview_data["responses"].append({
                 "question_id": question_data["id"],
                 "response": response
             })
             
             # Analyze response
-            analysis = self.analyze_response(question_text, response)
+            analysis = await self.analyze_response_async(question_text, response)
             self.interview_data["analyses"].append(analysis)
             
-            # Provide feedback
+            # Provide feedback, synthesizing the follow-up (if any) alongside it
             feedback_text = f"Thank you for your answer. {analysis['feedback']}"
-            self.ask_question(feedback_text)
+            follow_up = analysis.get("follow_up_question")
+            feedback_audio = asyncio.create_task(self.tts.text_to_speech_async(feedback_text))
+            if follow_up:
+                follow_up_audio = asyncio.create_task(self.tts.text_to_speech_async(follow_up))
+            self.tts.play_audio(await feedback_audio)
             
             # Ask follow-up if needed
-            if analysis.get("follow_up_question"):
-                self.ask_question(analysis["follow_up_question"])
-                follow_up_response = asyncio.run(self.get_candidate_response())
+            if follow_up:
+                self.tts.play_audio(await follow_up_audio)
+                follow_up_response = await self.get_candidate_response()
                 # Store follow-up response
                 
     def generate_report(self):
         """Generate final interview report"""
-        return self.llm.generate_final_report(self.interview_data)
\ No newline at end of file
+        return self.llm.generate_final_report(self.interview_data)
+
+    async def generate_report_async(self):
+        """Generate final interview report without blocking the event loop"""
+        return await self.llm.generate_final_report_async(self.interview_data)
+
+    def generate_report_scores(self):
+        """Generate the structured scores of the final report"""
+        return self.llm.generate_report_scores(self.interview_data)
+
+    def stream_summary(self):
+        """Stream the narrative summary and feedback of the final report"""
+        return self.llm.stream_report_narrative(self.interview_data)
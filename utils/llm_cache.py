@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_ENCODER_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+_QUANTIZED_FILE = "model_quantized.onnx"
+
+# Responses kept in memory; older ones are re-read from disk
+_MEMORY_CACHE_SIZE = 512
+# Longer texts would be cut at the encoder's 256-token window and compare equal
+# on their common prefix, so they only use the exact tier
+_MAX_SEMANTIC_CHARS = 1000
+
+_encoder = None
+
+
+class _OnnxEncoder:
+    """int8 MiniLM running on ONNX Runtime, with the same encode() call as SentenceTransformer"""
+
+    def __init__(self, model_dir):
+        import onnxruntime
+        from transformers import AutoTokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, _QUANTIZED_FILE),
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts, normalize_embeddings=True):
+        single = isinstance(texts, str)
+        batch = self.tokenizer(
+            [texts] if single else list(texts),
+            padding=True, truncation=True, max_length=256, return_tensors="np"
+        )
+        feeds = {name: batch[name].astype(np.int64) for name in self._input_names if name in batch}
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over the real (non-padding) tokens
+        mask = batch["attention_mask"][..., np.newaxis].astype(np.float32)
+        vectors = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True).clip(1e-12)
+        return vectors[0] if single else vectors
+
+
+def export_onnx_encoder(model_dir):
+    """Export MiniLM to ONNX and quantize it to int8 (one-off, needs optimum[onnxruntime])"""
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model = ORTModelForFeatureExtraction.from_pretrained(_ENCODER_MODEL, export=True)
+    model.save_pretrained(model_dir)
+    AutoTokenizer.from_pretrained(_ENCODER_MODEL).save_pretrained(model_dir)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantizer.quantize(
+        save_dir=model_dir,
+        quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    )
+    return os.path.join(model_dir, _QUANTIZED_FILE)
+
+
+def _get_encoder(onnx_dir=None):
+    """Load the sentence encoder once per process (only needed by the semantic tier)
+
+    Prefers the quantized ONNX export in `onnx_dir` and falls back to the
+    sentence-transformers model when it hasn't been exported.
+    """
+    global _encoder
+    if _encoder is None:
+        if onnx_dir and os.path.exists(os.path.join(onnx_dir, _QUANTIZED_FILE)):
+            _encoder = _OnnxEncoder(onnx_dir)
+        else:
+            from sentence_transformers import SentenceTransformer
+            _encoder = SentenceTransformer(_ENCODER_MODEL)
+    return _encoder
+
+
+class LLMCache:
+    """Two-tier cache for LLM responses.
+
+    The exact tier is keyed by SHA-256 of the prompt and lives in memory with a
+    JSON file per entry on disk, so it survives restarts. The optional semantic
+    tier only compares entries with the same `context` (prompt kind plus
+    everything that must match exactly, see make_context) and embeds just the
+    part that may vary, returning a stored response when a previous one is at
+    least `threshold` cosine-similar.
+    """
+
+    def __init__(self, cache_dir, enable_semantic=False, threshold=0.95, encoder_dir=None):
+        self.cache_dir = cache_dir
+        self.encoder_dir = encoder_dir
+        self.enable_semantic = enable_semantic
+        self.threshold = threshold
+        self._memory = OrderedDict()
+        # Sync handlers run in worker threads, so LRU updates are serialized
+        self._memory_lock = threading.Lock()
+        # context -> (keys, embedding matrix) of the entries stored under it
+        self._semantic_index = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if self.enable_semantic:
+            self._load_semantic_index()
+
+    @staticmethod
+    def make_key(prompt):
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_context(kind, *parts):
+        """Semantic-tier namespace: entries only match others with the same kind and exact parts"""
+        digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+        return f"{kind}:{digest}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _recall(self, key):
+        with self._memory_lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+            return text
+
+    def _remember(self, key, text):
+        with self._memory_lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            if len(self._memory) > _MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+
+    def _read_entry(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable LLM cache entry {key}: {e}")
+            return None
+
+    def _load_semantic_index(self):
+        """Rebuild the in-memory embedding matrices from the entries on disk"""
+        grouped = {}
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".json"):
+                continue
+            key = filename[:-5]
+            entry = self._read_entry(key)
+            # Entries written without a context predate scoped matching and stay exact-only
+            if entry and entry.get("embedding") and entry.get("context"):
+                keys, vectors = grouped.setdefault(entry["context"], ([], []))
+                keys.append(key)
+                vectors.append(entry["embedding"])
+        self._semantic_index = {
+            context: (keys, np.asarray(vectors, dtype=np.float32))
+            for context, (keys, vectors) in grouped.items()
+        }
+
+    def _embed(self, text):
+        vector = _get_encoder(self.encoder_dir).encode(text, normalize_embeddings=True)
+        return np.asarray(vector, dtype=np.float32)
+
+    def get(self, prompt, context=None, semantic_text=None):
+        """Return (key, cached_text, embedding); cached_text is None on a miss
+
+        The semantic tier is only consulted when both `context` and `semantic_text` are given.
+        """
+        key = self.make_key(prompt)
+        text = self._recall(key)
+        if text is not None:
+            return key, text, None
+
+        entry = self._read_entry(key)
+        if entry is not None:
+            self._remember(key, entry["response"])
+            return key, entry["response"], None
+
+        if (not self.enable_semantic or context is None or semantic_text is None
+                or len(semantic_text) > _MAX_SEMANTIC_CHARS):
+            return key, None, None
+
+        try:
+            embedding = self._embed(semantic_text)
+        except Exception as e:
+            logger.warning(f"Semantic cache disabled, encoder failed: {e}")
+            self.enable_semantic = False
+            return key, None, None
+
+        if context in self._semantic_index:
+            keys, vectors = self._semantic_index[context]
+            scores = vectors @ embedding
+            best = int(scores.argmax())
+            if scores[best] >= self.threshold:
+                entry = self._read_entry(keys[best])
+                if entry is not None:
+                    logger.info(f"Semantic LLM cache hit (similarity {scores[best]:.3f})")
+                    return key, entry["response"], embedding
+        return key, None, embedding
+
+    def put(self, key, prompt, text, embedding=None, context=None):
+        """Store a response in memory and on disk (and in the semantic index if embedded)"""
+        self._remember(key, text)
+        entry = {"prompt": prompt, "response": text}
+        if embedding is not None and context is not None:
+            entry["embedding"] = embedding.tolist()
+            entry["context"] = context
+        tmp_path = self._path(key) + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            logger.warning(f"Failed to persist LLM cache entry {key}: {e}")
+
+        if embedding is not None and context is not None:
+            row = embedding[np.newaxis, :]
+            if context in self._semantic_index:
+                keys, vectors = self._semantic_index[context]
+                self._semantic_index[context] = (keys + [key], np.vstack([vectors, row]))
+            else:
+                self._semantic_index[context] = ([key], row)